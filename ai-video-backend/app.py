@@ -1,9 +1,11 @@
-import os, uuid, tempfile, time
+import os, uuid, tempfile, time, json
+import urllib.request
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import cohere
 from dotenv import load_dotenv
+from llm_cache import LLMCache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,6 +18,7 @@ app.add_middleware(
 )
 
 co_client = cohere.Client(os.environ["COHERE_API_KEY"])
+llm_cache = LLMCache()  # repeat scripts/answers skip the Cohere round trip
 
 DB = {}  # job_id -> dict with status, url, error, timings, meta
 
@@ -23,6 +26,7 @@ class GenerateReq(BaseModel):
     prompt: str
     style: str | None = "friendly"
     duration_sec: int | None = 18  # keep short to stay <30s total
+    callback_url: str | None = None  # POSTed the job when it is ready or fails
 
 class ChatReq(BaseModel):
     message: str
@@ -31,7 +35,8 @@ class ChatReq(BaseModel):
 
 # ---------- LLM step ----------
 def cohere_script(prompt: str, style: str) -> str:
-    resp = co_client.generate(
+    return llm_cache.generate(
+        co_client,
         model="command",
         prompt=(
             f"Write a concise, {style} 5-6 sentence voiceover script for a short educational video.\n"
@@ -41,7 +46,6 @@ def cohere_script(prompt: str, style: str) -> str:
         max_tokens=240,
         temperature=0.4,
     )
-    return resp.generations[0].text.strip()
 
 # ---------- Chat function ----------
 def cohere_chat(message: str, video_script: str = None, context: str = "investment_education") -> str:
@@ -54,13 +58,13 @@ def cohere_chat(message: str, video_script: str = None, context: str = "investme
     prompt += f"Answer this question about {context}: {message}\n\n"
     prompt += "Provide helpful, accurate, and educational advice. Keep responses concise but informative."
     
-    resp = co_client.generate(
+    return llm_cache.generate(
+        co_client,
         model="command",
         prompt=prompt,
         max_tokens=300,
         temperature=0.7,
     )
-    return resp.generations[0].text.strip()
 
 # ---------- Simple Video Creation (No FFmpeg/Manim) ----------
 def create_simple_video(script: str, dur: int) -> str:
@@ -89,6 +93,17 @@ def get_local_video_url() -> str:
 
 def now_ms(): return int(time.time() * 1000)
 
+def notify_callback(job_id: str, callback_url: str | None):
+    """POST the finished job to the requester's webhook; failures are only logged"""
+    if not callback_url:
+        return
+    body = json.dumps({"id": job_id, **DB[job_id]}).encode()
+    request = urllib.request.Request(callback_url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        urllib.request.urlopen(request, timeout=10).close()
+    except Exception as e:
+        print(f"[callback] {callback_url} failed: {e}")
+
 # ---------- Pipeline ----------
 def pipeline(job_id: str, req: GenerateReq):
     t0 = now_ms()
@@ -120,6 +135,7 @@ def pipeline(job_id: str, req: GenerateReq):
         })
     except Exception as e:
         DB[job_id].update({"status": "error", "error": str(e)})
+    notify_callback(job_id, req.callback_url)
 
 # ---------- Endpoints ----------
 @app.post("/videos")
@@ -141,6 +157,10 @@ def chat(req: ChatReq):
     except Exception as e:
         return {"error": str(e), "response": "I'm sorry, I'm having trouble responding right now."}
 
+@app.get("/llm-cache")
+def get_llm_cache_stats():
+    return llm_cache.get_stats()
+
 @app.get("/")
 def root():
     return {"message": "AI Video Backend is running!"}
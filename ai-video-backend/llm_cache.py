@@ -0,0 +1,159 @@
+"""
+Persistent cache for LLM completions.
+
+Keys are a hash of the normalised prompt (case, whitespace and punctuation
+folded), the model and the generation parameters. Completions are stored
+in a small SQLite file with a TTL and least-recently-used eviction past
+max_entries. Concurrent identical requests are single-flighted: the first
+caller asks the model, the others wait for its answer.
+
+The upstream client is only used through its cohere-style
+``generate(model=..., prompt=..., **params)``, so a local fake client works
+for tests.
+
+backend/app/services/llm_cache.py and ai-video-backend/llm_cache.py are
+identical copies, as the two services deploy separately. Edit one, then run
+``python -m scripts.check_llm_cache_sync --fix`` from the backend directory.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# next to this module, wherever the service is started from
+DEFAULT_PATH = os.getenv("LLM_CACHE_PATH", str(Path(__file__).resolve().parent / "llm_cache.db"))
+DEFAULT_TTL_SEC = float(os.getenv("LLM_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """'  What is an ETF?? ' -> 'what is an etf'"""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMCache:
+    def __init__(self, path: str = DEFAULT_PATH, ttl_sec: float = DEFAULT_TTL_SEC,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_completions_last_used ON completions (last_used)")
+
+    @staticmethod
+    def make_key(prompt: str, model: str, **params) -> str:
+        payload = json.dumps([normalize_text(prompt), model, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._conn:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[str]:
+        """Live value for key, refreshing its last use (caller holds the lock and a transaction)"""
+        now = time.time()
+        row = self._conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if now - created > self.ttl_sec:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self.stats["evictions"] += 1
+            return None
+        self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used beyond max_entries (caller holds the lock)"""
+        expired = self._conn.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl_sec,)).rowcount
+        overflow = self._conn.execute(
+            "DELETE FROM completions WHERE key IN ("
+            "SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.stats["evictions"] += expired + overflow
+
+    def get_or_generate(self, key: str, generate: Callable[[], str]) -> str:
+        """Cached value for key, or call generate() once even if many threads ask at the same time"""
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return cached
+
+        with self._lock, self._conn:
+            flight = self._flights.get(key)
+            if flight is None:
+                # a leader may have stored the value and left since our miss
+                cached = self._get(key)
+                if cached is not None:
+                    self.stats["hits"] += 1
+                    return cached
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = generate()
+            self.set(key, flight.result)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def generate(self, client, model: str, prompt: str, **params) -> str:
+        """Cached ``client.generate(...)``; returns the stripped text of the first generation"""
+        key = self.make_key(prompt, model, **params)
+        return self.get_or_generate(
+            key, lambda: client.generate(model=model, prompt=prompt, **params).generations[0].text.strip()
+        )
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            return {**self.stats, "entries": entries, "max_entries": self.max_entries, "ttl_sec": self.ttl_sec}
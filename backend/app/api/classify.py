@@ -1,9 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from typing import List
 from app.utils.schemas import Transaction
-from app.models.classifier import classify
+from app.models.classifier import classify, classify_batch
 
 router = APIRouter()
 
+# upper bound on transactions accepted by a single batch request
+MAX_BATCH_SIZE = 50000
+
 @router.post("/")
 async def classify_transaction(txn: Transaction):
     label = classify(txn)
@@ -14,3 +18,20 @@ async def classify_transaction(txn: Transaction):
         "category": txn.category,
         "classification": label
     }
+
+@router.post("/batch")
+async def classify_transactions(txns: List[Transaction]):
+    """Classify many transactions in one call; results keep the request order"""
+    if len(txns) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} transactions per request")
+    labels = classify_batch(txns)
+    return [
+        {
+            "id": txn.id,
+            "merchant": txn.merchant,
+            "amount": txn.amount,
+            "category": txn.category,
+            "classification": label
+        }
+        for txn, label in zip(txns, labels)
+    ]
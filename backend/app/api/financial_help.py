@@ -1,122 +1,163 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import asyncio
 import cohere
+import json
 import os
 import uuid
-import json
-from datetime import datetime
+from typing import Literal, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-from app.services.video_generator import generate_financial_help_video
+from app.services import artefacts, job_events, job_store, render_cache, tts_cache
+from app.services.llm_cache import LLMCache
+from app.services.render_queue import BATCH, INTERACTIVE, QueueFull, render_queue
+from app.services.video_generator import (
+    TIERED_FINAL_QUALITY, VIDEO_QUALITY_TIERS, RenderCancelled, generate_financial_help_video, render_draft,
+)
 
 # Load environment variables
 load_dotenv()
 
 router = APIRouter()
 
-# In-memory job status tracking
-job_status_store = {}
+# repeat questions are answered from here instead of calling Cohere again
+answer_cache = LLMCache()
 
-def update_job_status(job_id: str, status: str, progress: int = 0, message: str = ""):
-    """Update job status with detailed information"""
-    job_status_store[job_id] = {
-        "status": status,
-        "progress": progress,
-        "message": message,
-        "updated_at": datetime.now().isoformat(),
-        "video_ready": False,
-        "voiceover_ready": False,
-        "final_video_ready": False
-    }
-    
-    # Also save to file for persistence
-    job_dir = Path(f"/Users/aymanfouad/Desktop/htnv2/htn-investEd/backend/videos/{job_id}")
-    job_dir.mkdir(parents=True, exist_ok=True)
-    
-    status_file = job_dir / "status.json"
-    with open(status_file, 'w') as f:
-        json.dump(job_status_store[job_id], f, indent=2)
+_cohere_client = None
+
+def get_cohere_client():
+    """One Cohere client per process instead of one per request"""
+    global _cohere_client
+    if _cohere_client is None:
+        api_key = os.getenv("COHERE_API_KEY")
+        if not api_key:
+            raise HTTPException(status_code=500, detail="Cohere API key not found in environment variables")
+        _cohere_client = cohere.Client(api_key)
+    return _cohere_client
+
+def update_job_status(job_id: str, status: str, progress: int = 0, message: str = "", timings: dict = None, **fields):
+    """Record job status in the job store and push it to stream subscribers; flags and timings carry over"""
+    job_status = job_store.update(job_id, status, progress, message, timings=timings, **fields)
+    job_events.publish(job_id, job_status)
+    return job_status
 
 def get_job_status(job_id: str) -> dict:
-    """Get job status with fallback to file"""
-    # Check in-memory first
-    if job_id in job_status_store:
-        return job_status_store[job_id]
-    
-    # Fallback to file
-    status_file = Path(f"/Users/aymanfouad/Desktop/htnv2/htn-investEd/backend/videos/{job_id}/status.json")
-    if status_file.exists():
-        with open(status_file, 'r') as f:
-            status = json.load(f)
-            job_status_store[job_id] = status  # Cache it
-            return status
-    
-    return {"status": "not_found", "progress": 0, "message": "Job not found"}
+    """Get job status from the job store (shared by every worker process)"""
+    status = job_store.get(job_id)
+    if status is None:
+        return {"status": "not_found", "progress": 0, "message": "Job not found"}
+    return status
 
-async def generate_video_with_tracking(text_content: str, job_id: str):
-    """Wrapper function to generate video with status tracking"""
+def fail_job(job_id: str, message: str):
+    """
+    Give up on a job. A tiered job whose draft is published keeps tier
+    "draft" and its playable final_video_url; tier_error says why the
+    full-quality upgrade failed.
+    """
+    if get_job_status(job_id).get("tier") == "draft":
+        return update_job_status(job_id, "failed", 0, f"Full-quality render failed, draft still available: {message}",
+                                 tier_error=message)
+    return update_job_status(job_id, "failed", 0, message)
+
+def generate_video_with_tracking(text_content: str, job_id: str, render_engine: str = None,
+                                 quality: str = None, cancel_event=None):
+    """
+    Wrapper function to generate video with status tracking (runs on a
+    render queue worker). Returns the job's final status.
+    """
     try:
         update_job_status(job_id, "processing", 10, "Starting video generation...")
         
         # Call the actual video generation function
-        video_path = generate_financial_help_video(text_content, job_id, update_job_status)
+        video_path = generate_financial_help_video(text_content, job_id, update_job_status,
+                                                   cancel_event=cancel_event, render_engine=render_engine,
+                                                   quality=quality)
         
         if video_path:
-            # Check if we got the final merged video with audio
-            job_dir = Path(f"/Users/aymanfouad/Desktop/htnv2/htn-investEd/backend/videos/{job_id}")
+            # Every stage recorded its output in the job's artefact manifest
+            manifest = artefacts.get_manifest(job_id)
+            files = artefacts.describe(job_id, manifest)
             final_video_file = Path(video_path)
             
-            # Video generation returns the merged video path, verify it exists and has content
-            if final_video_file.exists() and final_video_file.stat().st_size > 0:
-                # Check for individual components
-                video_files = list(job_dir.glob("**/FinancialHelpScene.mp4"))  # Original video
-                voiceover_files = list(job_dir.glob("**/voiceover.mp3"))       # Audio file
-                
-                # Check if we have the final merged video OR just the original video
-                if final_video_file.name == "final_video.mp4":
-                    # We have the merged video with audio
-                    update_job_status(job_id, "completed", 100, "Final video with synchronized audio created successfully")
-                    
-                    current_status = get_job_status(job_id)
-                    current_status["video_ready"] = len(video_files) > 0
-                    current_status["voiceover_ready"] = len(voiceover_files) > 0
-                    current_status["final_video_ready"] = True
-                    current_status["final_video_path"] = str(video_path)
-                    job_status_store[job_id] = current_status
+            # Check if we have the final merged video OR just the original video
+            if files["final_video"] and final_video_file.name == "final_video.mp4":
+                # We have the merged video with audio
+                final = update_job_status(
+                    job_id, "completed", 100, "Final video with synchronized audio created successfully",
+                    video_ready=files["video"] is not None,
+                    voiceover_ready=files["voiceover"] is not None,
+                    final_video_ready=True,
+                    final_video_path=str(video_path),
+                    files=files,
+                    tier="final",
+                    final_video_url=files["final_video"]["url"],
+                )
                     
-                    # Save updated status
-                    status_file = job_dir / "status.json"
-                    with open(status_file, 'w') as f:
-                        json.dump(current_status, f, indent=2)
-                        
-                elif "FinancialHelpScene.mp4" in str(video_path):
-                    # We have the original video (audio generation failed, likely quota issue)
-                    update_job_status(job_id, "completed", 100, "Video created successfully (audio generation failed due to quota)")
-                    
-                    current_status = get_job_status(job_id)
-                    current_status["video_ready"] = len(video_files) > 0
-                    current_status["voiceover_ready"] = len(voiceover_files) > 0 and any(f.stat().st_size > 0 for f in voiceover_files)
-                    current_status["final_video_ready"] = False
-                    current_status["video_path"] = str(video_path)
-                    job_status_store[job_id] = current_status
-                    
-                    # Save updated status
-                    status_file = job_dir / "status.json"
-                    with open(status_file, 'w') as f:
-                        json.dump(current_status, f, indent=2)
-                else:
-                    # Unknown video file
-                    update_job_status(job_id, "failed", 0, "Video generation produced unexpected output")
+            elif files["video"] and "FinancialHelpScene.mp4" in str(video_path):
+                # We have the original video (audio generation failed, likely quota issue)
+                final = update_job_status(
+                    job_id, "completed", 100, "Video created successfully (audio generation failed due to quota)",
+                    video_ready=True,
+                    voiceover_ready=files["voiceover"] is not None,
+                    final_video_ready=False,
+                    video_path=str(video_path),
+                    files=files,
+                    tier="final",
+                    final_video_url=files["video"]["url"],
+                )
+            elif final_video_file.name in ("final_video.mp4", "FinancialHelpScene.mp4"):
+                final = fail_job(job_id, "Final video file is missing or empty")
             else:
-                update_job_status(job_id, "failed", 0, "Final video file is missing or empty")
+                # Unknown video file
+                final = fail_job(job_id, "Video generation produced unexpected output")
         else:
-            update_job_status(job_id, "failed", 0, "Video generation pipeline failed")
+            final = fail_job(job_id, "Video generation pipeline failed")
             
+    except RenderCancelled:
+        final = update_job_status(job_id, "cancelled", 0, "Video generation was cancelled")
     except Exception as e:
-        update_job_status(job_id, "failed", 0, f"Error during generation: {str(e)}")
+        final = fail_job(job_id, f"Error during generation: {str(e)}")
+    return final["status"]
+
+def generate_tiered_video(text_content: str, job_id: str, render_engine: str = None, cancel_event=None):
+    """
+    First tier of a tiered job: publish a silent low-res draft within seconds,
+    then queue the full-quality render in the batch lane under the same job id.
+    The job's final_video_url points at the draft until the full render
+    replaces it in a single status write. Returns the job's final status, or
+    None once the full render is queued (that job reports the outcome).
+    """
+    try:
+        update_job_status(job_id, "processing", 5, "Rendering a quick draft...")
+        render_draft(text_content, job_id)
+        files = artefacts.describe(job_id, artefacts.get_manifest(job_id))
+        update_job_status(
+            job_id, "processing", 10, "Draft ready, rendering full quality...",
+            tier="draft", draft_ready=True, final_video_url=files["draft"]["url"], files=files,
+        )
+    except Exception as e:
+        # the full-quality render still runs; only the early preview is lost
+        print(f"[{job_id}] Draft render failed: {e}")
+    
+    if cancel_event is not None and cancel_event.is_set():
+        return update_job_status(job_id, "cancelled", 0, "Video generation was cancelled")["status"]
+    try:
+        render_queue.submit(job_id, generate_video_with_tracking, text_content, job_id, render_engine,
+                            TIERED_FINAL_QUALITY, priority=BATCH)
+    except QueueFull:
+        return fail_job(job_id, "Render queue is full")["status"]
+    return None
 
 class QuestionRequest(BaseModel):
     question: str
+    # batch callers (e.g. scripted monthly videos) queue behind interactive questions
+    batch: bool = False
+    # "manim" or "compositor"; defaults to VIDEO_RENDER_ENGINE
+    render_engine: Optional[Literal["manim", "compositor"]] = None
+    # draft first, full quality later; defaults to VIDEO_QUALITY_TIERS for interactive questions
+    tiered: Optional[bool] = None
 
 class QuestionResponse(BaseModel):
     answer: str
@@ -127,24 +168,31 @@ class QuestionResponse(BaseModel):
     final_video_url: str = None
     generation_status: str = "initiated"
     estimated_completion_time: str = None
+    queue_position: int = None
+
+def _queue_full_error(queued: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={"message": "Video render queue is full, try again shortly", "queue_position": queued + 1},
+        headers={"Retry-After": "30"},
+    )
 
 @router.post("/", response_model=QuestionResponse)
-async def get_financial_help(request: QuestionRequest, background_tasks: BackgroundTasks):
+async def get_financial_help(request: QuestionRequest):
     """
     Get easy-to-understand financial/investing help using Cohere's LLM.
     Takes a financial question and returns a simple, clear explanation with an animated video.
+    Returns 429 when the render queue is full.
     """
+    # refuse before paying for the LLM call
+    if render_queue.is_full():
+        raise _queue_full_error(render_queue.get_stats()["queued"])
+    
     try:
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
-        # Get Cohere API key from environment
-        api_key = os.getenv("COHERE_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="Cohere API key not found in environment variables")
-        
-        # Initialize Cohere client
-        co = cohere.Client(api_key)
+        co = get_cohere_client()
         
         # Create a prompt for financial help
         prompt = f"""You are a helpful financial advisor. Please provide a clear, easy-to-understand explanation for the following financial/investing question. Keep your answer concise (2-3 sentences) and use simple language that anyone can understand.
@@ -153,8 +201,10 @@ Question: {request.question}
 
 Answer:"""
         
-        # Generate response using Cohere
-        response = co.generate(
+        # Generate response using Cohere (cached; off the event loop on a miss)
+        answer = await run_in_threadpool(
+            answer_cache.generate,
+            co,
             model='command',
             prompt=prompt,
             max_tokens=150,
@@ -162,14 +212,25 @@ Answer:"""
             stop_sequences=["Question:", "Answer:"]
         )
         
-        # Extract the generated text
-        answer = response.generations[0].text.strip()
-        
         # Initialize job status
-        update_job_status(job_id, "initiated", 0, "Answer generated, queuing video generation...")
+        await run_in_threadpool(update_job_status, job_id, "initiated", 0, "Answer generated, queuing video generation...")
         
-        # Generate video in background with tracking
-        background_tasks.add_task(generate_video_with_tracking, answer, job_id)
+        # Queue the render; it runs on a render worker thread, off the event loop
+        tiered = request.tiered if request.tiered is not None else (VIDEO_QUALITY_TIERS and not request.batch)
+        try:
+            if tiered:
+                queue_position = render_queue.submit(
+                    job_id, generate_tiered_video, answer, job_id, request.render_engine,
+                    priority=BATCH if request.batch else INTERACTIVE,
+                )
+            else:
+                queue_position = render_queue.submit(
+                    job_id, generate_video_with_tracking, answer, job_id, request.render_engine, None,
+                    priority=BATCH if request.batch else INTERACTIVE,
+                )
+        except QueueFull as e:
+            await run_in_threadpool(update_job_status, job_id, "rejected", 0, "Render queue is full")
+            raise _queue_full_error(e.queued)
         
         return QuestionResponse(
             question=request.question,
@@ -178,10 +239,13 @@ Answer:"""
             video_url=f"/videos/{job_id}/FinancialHelpScene.mp4",  # Original video file
             voiceover_url=f"/videos/{job_id}/voiceover.mp3",  # Voiceover file
             final_video_url=f"/videos/{job_id}/final_video.mp4",  # Merged video with audio
-            generation_status="initiated",
-            estimated_completion_time="2-3 minutes"
+            generation_status="queued",
+            estimated_completion_time="2-3 minutes",
+            queue_position=queue_position
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
 
@@ -190,17 +254,16 @@ async def get_video_status(job_id: str):
     """Check detailed status of video generation for a given job ID"""
     
     # Get detailed job status
-    status_info = get_job_status(job_id)
+    status_info = await run_in_threadpool(get_job_status, job_id)
     
-    video_dir = Path(f"/Users/aymanfouad/Desktop/htnv2/htn-investEd/backend/videos/{job_id}")
+    # outputs come from the job's artefact manifest: no directory walk
+    manifest = await run_in_threadpool(artefacts.get_manifest, job_id)
     
-    if not video_dir.exists():
+    # queued jobs have no artefacts yet
+    if status_info["status"] == "not_found" and not manifest:
         return {"status": "not_found", "message": "Job ID not found", "progress": 0}
     
-    # Look for video files
-    video_files = list(video_dir.glob("**/*.mp4"))
-    voiceover_files = list(video_dir.glob("**/*.mp3"))
-    final_video_file = video_dir / "final_video.mp4"
+    files = artefacts.describe(job_id, manifest)
     
     # Build comprehensive response
     response = {
@@ -212,57 +275,133 @@ async def get_video_status(job_id: str):
         "video_ready": status_info.get("video_ready", False),
         "voiceover_ready": status_info.get("voiceover_ready", False),
         "final_video_ready": status_info.get("final_video_ready", False),
-        "files": {
-            "video": None,
-            "voiceover": None,
-            "final_video": None
-        }
+        "timings": status_info.get("timings", {}),
+        # tiered jobs: "draft" until the full-quality video replaces it, then "final"
+        "tier": status_info.get("tier"),
+        "final_video_url": status_info.get("final_video_url"),
+        "queue_position": render_queue.position(job_id),
+        "files": files
     }
     
     # Check for final merged video (highest priority)
-    final_video_file = video_dir / "final_video.mp4"
-    if final_video_file.exists() and final_video_file.stat().st_size > 0:
-        response["files"]["final_video"] = {
-            "url": f"/videos/{job_id}/final_video.mp4",
-            "file_size": final_video_file.stat().st_size,
-            "file_name": "final_video.mp4"
-        }
+    if files["final_video"]:
         response["final_video_ready"] = True
         response["status"] = "completed"  # Override status if final video is ready
     
-    # Add original video file info if available
-    if video_files:
-        video_path = video_files[0]
-        response["files"]["video"] = {
-            "url": f"/videos/{job_id}/{video_path.name}",
-            "file_size": video_path.stat().st_size,
-            "file_name": video_path.name
-        }
+    # Original video and voiceover (only listed when they have content)
+    if files["video"]:
         response["video_ready"] = True
-    
-    # Add voiceover file info if available
-    if voiceover_files:
-        voiceover_path = voiceover_files[0]
-        # Only show voiceover info if file has content
-        if voiceover_path.stat().st_size > 0:
-            response["files"]["voiceover"] = {
-                "url": f"/videos/{job_id}/{voiceover_path.name}",
-                "file_size": voiceover_path.stat().st_size,
-                "file_name": voiceover_path.name
-            }
-            response["voiceover_ready"] = True
-        else:
-            response["voiceover_ready"] = False
+    response["voiceover_ready"] = files["voiceover"] is not None
     
     return response
 
+# seconds between keepalive comments on an idle status stream
+STREAM_KEEPALIVE_SEC = 15
+
+# status flag -> (file kind, file name under /videos/{job_id}/)
+_FILE_EVENTS = {
+    "draft_ready": ("draft", "draft.mp4"),
+    "video_ready": ("video", "FinancialHelpScene.mp4"),
+    "voiceover_ready": ("voiceover", "voiceover.mp3"),
+    "final_video_ready": ("final_video", "final_video.mp4"),
+}
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _status_events(job_id: str, status: dict, files_sent: set) -> list:
+    """A progress event, plus a file event for each file that just became ready"""
+    events = [_sse("progress", status)]
+    for flag, (kind, file_name) in _FILE_EVENTS.items():
+        if status.get(flag) and kind not in files_sent:
+            files_sent.add(kind)
+            # completed jobs carry their manifest entries; otherwise the conventional name
+            described = (status.get("files") or {}).get(kind) or {"url": f"/videos/{job_id}/{file_name}"}
+            events.append(_sse("file", {"job_id": job_id, "kind": kind, **described}))
+    return events
+
+async def _stream_status(request: Request, job_id: str, queue: asyncio.Queue, status: dict):
+    files_sent = set()
+    try:
+        while True:
+            for event in _status_events(job_id, status, files_sent):
+                yield event
+            if status["status"] in job_store.TERMINAL_STATUSES:
+                return
+            try:
+                status = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE_SEC)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                # jobs rendered by another worker process never reach this hub
+                latest = await run_in_threadpool(get_job_status, job_id)
+                if latest.get("updated_at") == status.get("updated_at"):
+                    continue
+                status = latest
+    finally:
+        job_events.unsubscribe(job_id, queue)
+
+@router.get("/video-status/{job_id}/stream")
+async def stream_video_status(job_id: str, request: Request):
+    """
+    Server-Sent Events stream of a job's status: a "progress" event per
+    status change and a "file" event when a video or voiceover is ready.
+    Ends after the final status. No filesystem access or polling per client.
+    """
+    # subscribe before reading so no update falls between the two
+    queue = job_events.subscribe(job_id)
+    status = await run_in_threadpool(get_job_status, job_id)
+    if status["status"] == "not_found":
+        job_events.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _stream_status(request, job_id, queue, status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/jobs")
-async def get_all_jobs():
-    """Get status of all jobs for debugging"""
-    return {
-        "jobs": job_status_store,
-        "total_jobs": len(job_status_store)
-    }
+async def get_all_jobs(
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(job_store.DEFAULT_PAGE_SIZE, ge=1, le=job_store.MAX_PAGE_SIZE),
+):
+    """Jobs, most recently updated first; pass next_cursor back as cursor for the next page"""
+    try:
+        return await run_in_threadpool(job_store.list_jobs, status, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next pipeline stage"""
+    outcome = render_queue.cancel(job_id)
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Job is not queued or running")
+    if outcome == "cancelled":
+        await run_in_threadpool(update_job_status, job_id, "cancelled", 0, "Video generation was cancelled")
+    return {"job_id": job_id, "status": outcome}
+
+@router.get("/queue")
+async def get_queue_stats():
+    """Render queue depth, running jobs and counters"""
+    return render_queue.get_stats()
+
+@router.get("/render-cache")
+async def get_render_cache_stats():
+    """Hit/miss/eviction counters of the render cache"""
+    return render_cache.get_stats()
+
+@router.get("/tts-cache")
+async def get_tts_cache_stats():
+    """Hit rate and characters saved by the per-sentence voiceover clip cache"""
+    return tts_cache.get_stats()
+
+@router.get("/answer-cache")
+async def get_answer_cache_stats():
+    """Hit/miss counters of the LLM answer cache"""
+    return await run_in_threadpool(answer_cache.get_stats)
 
 @router.get("/health")
 async def health_check():
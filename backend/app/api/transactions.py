@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Query, Response, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import io
 
-from app.utils.schemas import Transaction
-from app.core.database import SessionLocal
-from app.services import transaction_crud
+from app.utils.schemas import Transaction, TransactionPage, BulkTransactionResult, StatementImportResult
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.services import transaction_crud, transaction_crud_async, statement_import
+from app.services.transaction_writer import transaction_writer
 from app.models.transaction_db import TransactionDB
 
 router = APIRouter()
 
-# Dependency
-def get_db():
+# upper bound on rows accepted by a single bulk request
+MAX_BULK_ROWS = 50000
+
+# Dependencies
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# sync session for routes that run in the threadpool (plain def)
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -18,15 +31,75 @@ def get_db():
         db.close()
 
 @router.post("/", response_model=Transaction)
-async def create_transaction(txn: Transaction, db: Session = Depends(get_db)):
-    return transaction_crud.create_transaction(db, txn)
+async def create_transaction(txn: Transaction, db: AsyncSession = Depends(get_db)):
+    if transaction_writer.running:
+        return await transaction_writer.submit(txn)
+    return await transaction_crud_async.create_transaction(db, txn)
+
+@router.post("/bulk", response_model=BulkTransactionResult)
+async def create_transactions_bulk(rows: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_db)):
+    """
+    Insert many transactions in one request.
+    Rows are validated individually; invalid rows are reported by index and skipped.
+    """
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per request")
+    return await transaction_crud_async.create_transactions_bulk(db, rows)
+
+@router.post("/import", response_model=StatementImportResult)
+def import_statement(
+    response: Response,
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None),
+    resume_after: Optional[int] = Form(None),
+    db: Session = Depends(get_sync_db),
+):
+    """
+    Stream a CSV or NDJSON bank export into the database.
+    The upload is parsed incrementally and written in fixed-size batches.
+    If the import stops early (400 for an undecodable file, 500 for a write
+    error) the body is still the summary: rows up to resume_after are
+    committed, and re-uploading with resume_after skips them.
+    """
+    fmt = format or statement_import.detect_format(file.filename)
+    if fmt not in statement_import.SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown statement format, pass format=csv or format=ndjson")
 
-@router.get("/", response_model=List[Transaction])
-async def list_transactions(user_id: str, db: Session = Depends(get_db)):
-    return transaction_crud.get_transactions(db, user_id)
+    def report(progress: dict):
+        print(f"[import {file.filename}] {progress['rows']} rows, {progress['inserted']} inserted, "
+              f"{progress['failed']} failed, {progress['rows_per_sec']} rows/s")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        summary = statement_import.import_statement(db, stream, fmt, user_id=user_id, progress_callback=report,
+                                                    resume_after=resume_after)
+    finally:
+        stream.detach()
+    if summary["aborted"]:
+        response.status_code = 400 if summary["aborted"]["reason"] == "decode" else 500
+    return summary
+
+@router.get("/", response_model=TransactionPage)
+async def list_transactions(
+    user_id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(transaction_crud.DEFAULT_PAGE_SIZE, ge=1, le=transaction_crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    A page of a user's transactions, newest first, with from <= date < to.
+    Follow next_cursor (passed back as ?cursor=) for the next page.
+    """
+    try:
+        return await transaction_crud_async.get_transactions(db, user_id, start, end, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Debug endpoint to see raw DB rows
 @router.get("/all_raw")
-async def all_raw(db: Session = Depends(get_db)):
-    rows = db.query(TransactionDB).all()
+async def all_raw(db: AsyncSession = Depends(get_db)):
+    rows = (await db.scalars(select(TransactionDB))).all()
     return [row.__dict__ for row in rows]  # convert SQLAlchemy objects to dicts
\ No newline at end of file
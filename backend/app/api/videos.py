@@ -0,0 +1,128 @@
+"""
+Video delivery: byte ranges, strong ETags and cache headers for everything
+under VIDEOS_DIR (MP4s, voiceovers and HLS playlists/segments).
+
+Artefacts recorded in a job's manifest never change once written, so they
+are served as immutable with their sha256 as the ETag; anything else (files
+still being produced) must be revalidated.
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.services import artefacts
+
+router = APIRouter()
+
+CHUNK_SIZE = 256 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _resolve(file_path: str) -> Path:
+    root = artefacts.VIDEOS_DIR.resolve()
+    path = (root / file_path).resolve()
+    if root not in path.parents or not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+    return path
+
+
+def _validators(path: Path, stat: os.stat_result) -> Tuple[str, bool]:
+    """(strong ETag, immutable) for a file under VIDEOS_DIR"""
+    relative = path.relative_to(artefacts.VIDEOS_DIR.resolve())
+    if len(relative.parts) > 1:
+        job_id, inside = relative.parts[0], Path(*relative.parts[1:])
+        manifest = artefacts.get_manifest(job_id)
+        for entry in manifest.values():
+            if Path(entry["path"]) == inside and entry["size"] == stat.st_size:
+                return f'"{entry["sha256"]}"', True
+        # HLS segments are final once their playlist is recorded
+        playlist = manifest.get("hls")
+        if playlist is not None and Path(playlist["path"]).parent in inside.parents:
+            return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', True
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single "bytes=" range; None to serve the
+    whole file (no header, several ranges or a malformed one). Raises 416
+    when the range lies past the end of the file.
+    """
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _read(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+def get_video_file(file_path: str, request: Request):
+    """Serve a file with Range/If-Range/If-None-Match support"""
+    path = _resolve(file_path)
+    stat = path.stat()
+    etag, immutable = _validators(path, stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    # If-Range: only honour the range when the client's copy is still current
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = _parse_range(range_header, stat.st_size)
+
+    if byte_range is None:
+        start, end, status_code = 0, stat.st_size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(_read(path, start, length), status_code=status_code,
+                             headers=headers, media_type=media_type)
@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from pathlib import Path
@@ -8,11 +11,78 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # Construct the absolute path to your database file
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{BASE_DIR}/app.db"
+DB_PATH = os.getenv("DB_PATH", f"{BASE_DIR}/app.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# "default" keeps SQLite's stock settings; "concurrent" switches the file to
+# WAL with the pragmas below and routes single-row writes through the
+# group-committing TransactionWriter (app/services/transaction_writer.py)
+DB_STORAGE_MODE = os.getenv("DB_STORAGE_MODE", "default")
+CONCURRENT_MODE = DB_STORAGE_MODE == "concurrent"
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+SQLITE_CONCURRENT_PRAGMAS = {
+    # readers keep reading the last committed snapshot while a write is in progress
+    "journal_mode": "WAL",
+    # in WAL mode NORMAL is still crash-safe; only the last commits can roll back on power loss
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # negative = KiB, i.e. a 64 MiB page cache per connection
+    "cache_size": -64000,
+    # wait for the write lock instead of failing with "database is locked"
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_sqlite_pragmas(sync_engine, pragmas=SQLITE_CONCURRENT_PRAGMAS):
+    """Run the pragmas on every new DBAPI connection of sync_engine"""
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def make_engines(db_path: str = DB_PATH, concurrent: bool = CONCURRENT_MODE):
+    """Sync and async (aiosqlite) engines for one SQLite file"""
+    pool_args = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW} if concurrent else {}
+    sync_engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, **pool_args
+    )
+    # Same file through aiosqlite, for async routes: queries are awaited instead
+    # of blocking the event loop. Scripts and startup keep the sync engine.
+    aio_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", **pool_args)
+    if concurrent:
+        apply_sqlite_pragmas(sync_engine)
+        apply_sqlite_pragmas(aio_engine.sync_engine)
+    return sync_engine, aio_engine
+
+
+engine, async_engine = make_engines()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+
+
+def migrate_schema(bind=engine):
+    """
+    Create missing tables, then add the columns and indexes that create_all
+    skips on tables that already exist. New columns must be nullable.
+    """
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
@@ -1,13 +1,74 @@
+import asyncio
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from app.api import transactions, insights, classify, chatbot, health, financial_help
-from app.core.database import Base, engine
+from app.api import transactions, insights, classify, chatbot, health, financial_help, videos
+from app.core.database import CONCURRENT_MODE, SessionLocal, migrate_schema
 from app.models.transaction_db import TransactionDB
+from app.services import job_store, render_pool, transaction_crud, video_client, video_generator
+from app.services.transaction_writer import transaction_writer
+
+# create tables / add new columns
+migrate_schema()
+
+with SessionLocal() as db:
+    # first start with the rollup table: build it from existing transactions.
+    # Must run before reclassifying, whose deltas assume the rollups are complete
+    transaction_crud.ensure_rollups(db)
+    # label rows written before the classification column existed
+    transaction_crud.reclassify_transactions(db, only_missing=True)
 
-# create tables
-Base.metadata.create_all(bind=engine)
 app = FastAPI(title="RBC Insights Backend")
 
+@app.on_event("startup")
+async def start_transaction_writer():
+    # group-commit single transaction writes in the concurrent storage mode
+    if CONCURRENT_MODE:
+        transaction_writer.start()
+
+@app.on_event("shutdown")
+async def stop_transaction_writer():
+    await transaction_writer.stop()
+
+@app.on_event("shutdown")
+async def close_video_client():
+    await video_client.close()
+
+# keeps startup background tasks referenced until they finish
+_background_tasks: set = set()
+
+async def _warm_render_workers():
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, render_pool.start)
+    except Exception as e:
+        # video requests still start workers on demand (and report the error)
+        print(f"Could not warm the render workers: {e}")
+        return
+    # render the shared intro/outro once; a job that needs one first waits on
+    # the same per-segment lock instead of rendering it twice
+    try:
+        await loop.run_in_executor(None, video_generator.prepare_shared_segments)
+    except Exception as e:
+        print(f"Could not pre-render intro/outro segments: {e}")
+
+@app.on_event("startup")
+async def warm_render_workers():
+    # import manim in the render workers and pre-render the shared segments in
+    # the background, so the API serves requests right away and a broken
+    # manim install cannot stop it booting
+    task = asyncio.create_task(_warm_render_workers())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+@app.on_event("shutdown")
+async def stop_render_workers():
+    render_pool.shutdown()
+
+@app.on_event("shutdown")
+async def flush_job_store():
+    # write buffered progress updates before the process exits
+    job_store.flush()
+
 # include routers
 app.include_router(health.router, prefix="/health")
 app.include_router(transactions.router, prefix="/transactions")
@@ -16,5 +77,5 @@ app.include_router(classify.router, prefix="/classify")
 app.include_router(chatbot.router, prefix="/chatbot")
 app.include_router(financial_help.router, prefix="/financial-help")
 
-# Mount static files for serving videos
-app.mount("/videos", StaticFiles(directory="videos"), name="videos")
+# videos: byte ranges, ETags and cache headers (see app/api/videos.py)
+app.include_router(videos.router, prefix="/videos")
@@ -1,2 +1,4 @@
 from .transaction_db import TransactionDB
 from .insight import Insight
+from .spending_rollup import SpendingRollupDB
+from .video_job import VideoJobDB
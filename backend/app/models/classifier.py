@@ -1,19 +1,96 @@
+import re
+from typing import Iterable, List, Optional, Pattern
+
 from app.utils.schemas import Transaction
 
 # simple keyword-based classifier
 NECESSARY_KEYWORDS = ["rent", "tuition", "hydro", "insurance", "grocery", "gas"]
 UNNECESSARY_KEYWORDS = ["coffee", "starbucks", "tim hortons", "uber eats", "netflix", "gaming"]
 
-def classify(txn: Transaction) -> str:
-    desc = (txn.description or txn.merchant).lower()
 
-    # rule-based checks
-    if any(word in desc for word in NECESSARY_KEYWORDS):
-        return "necessary"
-    if any(word in desc for word in UNNECESSARY_KEYWORDS):
+def _trie_regex(keywords: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compile keywords into one regex shaped like a prefix trie.
+
+    "gas", "gaming" becomes ga(?:s|ming), so the regex engine walks shared
+    prefixes once instead of trying every keyword at every position; match
+    cost depends on the text and keyword length, not on how many keywords
+    there are.
+    """
+    trie: dict = {}
+    for word in keywords:
+        word = word.lower()
+        if not word:
+            continue
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True  # end-of-keyword marker
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        # a keyword ends here, so the rest of this subtree is optional
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    if not trie:
+        return None
+    return re.compile(build(trie))
+
+
+class KeywordMatcher:
+    """Compiled matcher for the necessary/unnecessary keyword lists"""
+
+    def __init__(self, necessary: Iterable[str], unnecessary: Iterable[str]):
+        self.necessary = _trie_regex(necessary)
+        self.unnecessary = _trie_regex(unnecessary)
+
+    def label(self, text: str, amount: float) -> str:
+        desc = (text or "").lower()
+
+        # rule-based checks
+        if self.necessary and self.necessary.search(desc):
+            return "necessary"
+        if self.unnecessary and self.unnecessary.search(desc):
+            return "unnecessary"
+
+        # fallback heuristic
+        if amount > 500:
+            return "necessary"
         return "unnecessary"
 
-    # fallback heuristic
-    if txn.amount > 500:
-        return "necessary"
-    return "unnecessary"
\ No newline at end of file
+
+_matcher: Optional[KeywordMatcher] = None
+
+
+def get_matcher() -> KeywordMatcher:
+    """Return the compiled matcher, building it on first use"""
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher(NECESSARY_KEYWORDS, UNNECESSARY_KEYWORDS)
+    return _matcher
+
+
+def rebuild_matcher() -> KeywordMatcher:
+    """Recompile the matcher after the keyword lists change"""
+    global _matcher
+    _matcher = None
+    return get_matcher()
+
+
+def classify(txn: Transaction) -> str:
+    return get_matcher().label(txn.description or txn.merchant, txn.amount)
+
+
+def classify_batch(txns: List) -> List[str]:
+    """
+    Classify many transactions with one matcher lookup.
+    Accepts Transaction schemas or anything with the same attributes (e.g. TransactionDB rows).
+    """
+    matcher = get_matcher()
+    return [matcher.label(txn.description or txn.merchant, txn.amount) for txn in txns]
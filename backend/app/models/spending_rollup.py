@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint
+from app.core.database import Base
+
+class SpendingRollupDB(Base):
+    """
+    Running totals per (user, month, category, classification).
+    Maintained by transaction_crud on every write; month is "YYYY-MM" and
+    missing category/classification values are stored as "".
+    """
+    __tablename__ = "spending_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category", "classification", name="uq_spending_rollup_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, nullable=False)
+    month = Column(String(7), nullable=False)
+    category = Column(String, nullable=False, default="")
+    classification = Column(String, nullable=False, default="")
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from app.core.database import Base
 import datetime
 
 class TransactionDB(Base):
     __tablename__ = "transactions"
+    # serves the per-user date filters and keyset pages of GET /transactions
+    __table_args__ = (Index("ix_transactions_user_id_date", "user_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, index=True)
@@ -12,3 +14,5 @@ class TransactionDB(Base):
     date = Column(DateTime, default=datetime.datetime.utcnow)
     description = Column(String, nullable=True)
     category = Column(String, nullable=True)
+    # "necessary" / "unnecessary", set by transaction_crud on write
+    classification = Column(String, nullable=True, index=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Index
+from app.core.database import Base
+import datetime
+
+class VideoJobDB(Base):
+    """Financial-help video job state, written through app/services/job_store.py"""
+    __tablename__ = "video_jobs"
+    __table_args__ = (Index("ix_video_jobs_status_updated_at", "status", "updated_at"),)
+
+    job_id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, index=True)
+    progress = Column(Integer, nullable=False, default=0)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    video_ready = Column(Boolean, nullable=False, default=False)
+    voiceover_ready = Column(Boolean, nullable=False, default=False)
+    final_video_ready = Column(Boolean, nullable=False, default=False)
+    # per-stage timings and result paths
+    timings = Column(JSON, nullable=True)
+    details = Column(JSON, nullable=True)
@@ -0,0 +1,127 @@
+"""
+Per-job artefact manifest.
+
+Each pipeline stage records the file it produced (render output,
+voiceover, final mux) with its size, duration and checksum in
+videos/{job_id}/manifest.json. Status and URL responses are built from the
+manifest alone instead of globbing the job directory (Manim's media tree
+is several levels deep). Manifests are cached in memory and revalidated
+with a single stat, so other worker processes' writes are picked up.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+VIDEOS_DIR = Path(os.getenv("VIDEOS_DIR", "../htn-investEd/backend/videos"))
+MANIFEST_FILE = "manifest.json"
+CACHED_MANIFESTS = 1024
+
+# artefact kinds, in the order responses list them
+KINDS = ("draft", "video", "voiceover", "final_video", "hls")
+
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+# job_id -> (manifest mtime_ns, manifest)
+_cache: "OrderedDict[str, Tuple[int, Dict[str, dict]]]" = OrderedDict()
+
+
+def job_dir(job_id: str) -> Path:
+    return VIDEOS_DIR / job_id
+
+
+def _checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _duration(path: Path) -> Optional[float]:
+    """Duration in seconds from ffprobe, None if it cannot be read"""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+            capture_output=True, text=True,
+        )
+        return round(float(result.stdout.strip()), 3) if result.returncode == 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_put(job_id: str, mtime_ns: int, manifest: Dict[str, dict]) -> None:
+    # caller holds the lock
+    _cache[job_id] = (mtime_ns, manifest)
+    _cache.move_to_end(job_id)
+    while len(_cache) > CACHED_MANIFESTS:
+        _cache.popitem(last=False)
+
+
+def _read(job_id: str) -> Dict[str, dict]:
+    # caller holds the lock
+    manifest_path = job_dir(job_id) / MANIFEST_FILE
+    try:
+        mtime_ns = manifest_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _cache.get(job_id)
+    if cached is not None and cached[0] == mtime_ns:
+        _cache.move_to_end(job_id)
+        return cached[1]
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    _cache_put(job_id, mtime_ns, manifest)
+    return manifest
+
+
+def get_manifest(job_id: str) -> Dict[str, dict]:
+    """kind -> {path, size, duration, sha256}; empty if nothing was recorded"""
+    with _lock:
+        return dict(_read(job_id))
+
+
+def record(job_id: str, kind: str, path: str) -> dict:
+    """Add the file a stage produced to the job's manifest and return its entry"""
+    file_path = Path(path)
+    directory = job_dir(job_id)
+    entry = {
+        "path": os.path.relpath(file_path.resolve(), directory.resolve()),
+        "size": file_path.stat().st_size,
+        "duration": _duration(file_path),
+        "sha256": _checksum(file_path),
+    }
+    with _lock:
+        manifest = {**_read(job_id), kind: entry}
+        manifest_path = directory / MANIFEST_FILE
+        temp_path = directory / f".{MANIFEST_FILE}.{os.getpid()}.tmp"
+        temp_path.write_text(json.dumps(manifest, indent=2))
+        # readers never see a half-written manifest
+        os.replace(temp_path, manifest_path)
+        _cache_put(job_id, manifest_path.stat().st_mtime_ns, manifest)
+    return entry
+
+
+def describe(job_id: str, manifest: Dict[str, dict]) -> Dict[str, Optional[dict]]:
+    """The "files" block of video-status: kind -> url, size and name, or None"""
+    files = {}
+    for kind in KINDS:
+        entry = manifest.get(kind)
+        if entry is None or entry["size"] <= 0:
+            files[kind] = None
+            continue
+        files[kind] = {
+            "url": f"/videos/{job_id}/{Path(entry['path']).as_posix()}",
+            "file_size": entry["size"],
+            "file_name": Path(entry["path"]).name,
+            "duration": entry.get("duration"),
+            "sha256": entry.get("sha256"),
+        }
+    return files
@@ -0,0 +1,218 @@
+"""
+Template compositor: a fast alternative to the Manim render engine.
+
+The financial-help video is only text cards fading in and out on a plain
+background, so instead of running Manim this module:
+
+- lays the cards out with the same scene_layout logic as FinancialHelpScene,
+- rasterises the title, each card and the outro once with Pillow,
+- builds every frame by alpha-blending those layers (premultiplied, only
+  inside each layer's bounding box) with NumPy, reusing the previous frame
+  while nothing changes,
+- pipes the raw frames into a single ffmpeg encode.
+
+The title fades in where Manim writes it on; everything else follows the
+scene's layout and timings at the same resolution and frame rate.
+"""
+import os
+import subprocess
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services import scene_layout
+
+# Manim quality flag -> (width, height, fps), as in Manim's quality presets;
+# "d" is the compositor-only draft tier
+RESOLUTIONS = {
+    "d": (426, 240, 10),
+    "l": (854, 480, 15),
+    "m": (1280, 720, 30),
+    "h": (1920, 1080, 60),
+    "k": (3840, 2160, 60),
+}
+
+# Manim frame height in scene units
+FRAME_HEIGHT_UNITS = 8
+
+# Manim colours used by FinancialHelpScene
+BACKGROUND = (0, 0, 0)
+BLUE = (88, 196, 221)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+DARK_GRAY = (68, 68, 68)
+
+FONTS = {
+    "regular": os.getenv("COMPOSITOR_FONT", "DejaVuSans.ttf"),
+    "bold": os.getenv("COMPOSITOR_FONT_BOLD", "DejaVuSans-Bold.ttf"),
+    "italic": os.getenv("COMPOSITOR_FONT_ITALIC", "DejaVuSans-Oblique.ttf"),
+}
+
+
+class _Layer:
+    """A rasterised element: premultiplied RGB and alpha inside its bounding box"""
+
+    def __init__(self, image: Image.Image):
+        left, top, right, bottom = image.getbbox() or (0, 0, 1, 1)
+        rgba = np.asarray(image.crop((left, top, right, bottom)), dtype=np.float32) / 255.0
+        self.box = (top, bottom, left, right)
+        self.alpha = rgba[:, :, 3:4]
+        self.rgb = rgba[:, :, :3] * self.alpha * 255.0
+
+
+# (layer, opacity) pairs drawn in order
+_State = Tuple[Tuple[_Layer, float], ...]
+
+
+def _smooth(t: float) -> float:
+    """Ease in/out, close to Manim's default rate function"""
+    t = min(1.0, max(0.0, t))
+    return t * t * (3 - 2 * t)
+
+
+class _Canvas:
+    def __init__(self, quality: str):
+        self.width, self.height, self.fps = RESOLUTIONS[quality]
+        self.px_per_unit = self.height / FRAME_HEIGHT_UNITS
+
+    def px(self, units: float) -> int:
+        return round(units * self.px_per_unit)
+
+    def font(self, style: str, font_size: float) -> ImageFont.FreeTypeFont:
+        # Manim font sizes are relative to a 48pt default; scale to the frame
+        size = max(8, round(font_size * self.height / 640))
+        try:
+            return ImageFont.truetype(FONTS[style], size)
+        except OSError:
+            return ImageFont.load_default(size=size)
+
+    def blank(self) -> Tuple[Image.Image, ImageDraw.ImageDraw]:
+        image = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 0))
+        return image, ImageDraw.Draw(image)
+
+    def centre(self, y_units: float) -> Tuple[int, int]:
+        return self.width // 2, self.height // 2 - self.px(y_units)
+
+    def text_layer(self, text: str, style: str, font_size: float, color: tuple, y_units: float) -> _Layer:
+        image, draw = self.blank()
+        draw.text(self.centre(y_units), text, font=self.font(style, font_size), fill=color, anchor="mm")
+        return _Layer(image)
+
+    def card_layer(self, lines: List[str]) -> _Layer:
+        """Lines stacked 0.2 units apart on a rounded, faintly filled card"""
+        font_size = 24
+        while True:
+            font = self.font("regular", font_size)
+            heights = [font.getbbox(line)[3] - font.getbbox(line)[1] for line in lines]
+            widths = [font.getlength(line) for line in lines]
+            group_height = sum(heights) + self.px(0.2) * (len(lines) - 1)
+            # Ensure content fits within bounds, as the scene does
+            if group_height <= self.px(3.5) or font_size <= 8:
+                break
+            font_size *= self.px(3.5) / group_height
+
+        image, draw = self.blank()
+        cx, cy = self.centre(scene_layout.CONTENT_Y)
+        card_w = max(widths) + self.px(1)
+        card_h = group_height + self.px(0.8)
+        draw.rounded_rectangle(
+            (cx - card_w / 2, cy - card_h / 2, cx + card_w / 2, cy + card_h / 2),
+            radius=self.px(0.2),
+            fill=DARK_GRAY + (round(255 * 0.1),),
+            outline=DARK_GRAY + (round(255 * 0.3),),
+            width=max(1, round(self.height / 480)),
+        )
+        y = cy - group_height / 2
+        for line, line_height in zip(lines, heights):
+            draw.text((cx, y + line_height / 2), line, font=font, fill=WHITE, anchor="mm")
+            y += line_height + self.px(0.2)
+        return _Layer(image)
+
+
+def _timeline(title: _Layer, cards: List[_Layer], outro: _Layer,
+              card_holds: Optional[List[float]] = None) -> List[Tuple[float, Callable[[float], _State]]]:
+    """(duration, progress -> visible layers) in FinancialHelpScene order"""
+    L = scene_layout
+    holds = card_holds or [L.CARD_HOLD_SEC] * len(cards)
+    steps = [
+        (L.TITLE_WRITE_SEC, lambda t: ((title, _smooth(t)),)),
+        (L.TITLE_HOLD_SEC, lambda t: ((title, 1.0),)),
+    ]
+    for card, hold in zip(cards, holds):
+        steps += [
+            (L.CARD_FADE_IN_SEC, lambda t, card=card: ((title, 1.0), (card, _smooth(t)))),
+            (hold, lambda t, card=card: ((title, 1.0), (card, 1.0))),
+            (L.CARD_FADE_OUT_SEC, lambda t, card=card: ((title, 1.0), (card, 1 - _smooth(t)))),
+        ]
+    steps += [
+        (L.OUTRO_FADE_IN_SEC, lambda t: ((title, 1.0), (outro, _smooth(t)))),
+        (L.OUTRO_HOLD_SEC, lambda t: ((title, 1.0), (outro, 1.0))),
+        (L.OUTRO_FADE_OUT_SEC, lambda t: ((title, 1 - _smooth(t)), (outro, 1 - _smooth(t)))),
+        (L.END_HOLD_SEC, lambda t: ()),
+    ]
+    return steps
+
+
+def _compose(background: np.ndarray, state: _State) -> bytes:
+    frame = background.copy()
+    for layer, opacity in state:
+        if opacity <= 0:
+            continue
+        top, bottom, left, right = layer.box
+        region = frame[top:bottom, left:right]
+        region *= 1 - layer.alpha * opacity
+        region += layer.rgb * opacity
+    return frame.astype(np.uint8).tobytes()
+
+
+def render(text_content: str, output_path: str, quality: str = "l",
+           card_holds: Optional[List[float]] = None) -> str:
+    """
+    Render the financial-help video for text_content to output_path (mp4);
+    card_holds sets how long each card stays up (default CARD_HOLD_SEC)
+    """
+    canvas = _Canvas(quality)
+    title = canvas.text_layer(scene_layout.TITLE_TEXT, "bold", 40, BLUE, scene_layout.TITLE_Y)
+    outro = canvas.text_layer(scene_layout.OUTRO_TEXT, "italic", 24, YELLOW, scene_layout.FOOTER_Y)
+    cards = [canvas.card_layer(lines) for lines in scene_layout.text_cards(text_content)]
+    background = np.empty((canvas.height, canvas.width, 3), dtype=np.float32)
+    background[:] = BACKGROUND
+
+    cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{canvas.width}x{canvas.height}",
+        "-r", str(canvas.fps),
+        "-i", "pipe:0",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart",
+        "-y",
+        str(output_path)
+    ]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    previous_state: Optional[tuple] = None
+    frame = b""
+    try:
+        for duration, visible in _timeline(title, cards, outro, card_holds):
+            # counted like Manim, so narration offsets line up with either engine
+            frames = max(1, scene_layout.frame_count(duration, canvas.fps))
+            for index in range(frames):
+                state = visible((index + 1) / frames)
+                # holds repeat the same frame: blend it once
+                key = tuple((id(layer), round(opacity, 4)) for layer, opacity in state)
+                if key != previous_state:
+                    frame = _compose(background, state)
+                    previous_state = key
+                process.stdin.write(frame)
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    stderr = process.stderr.read().decode(errors="replace")
+    if process.wait() != 0:
+        raise Exception(f"FFmpeg encode failed: {stderr}")
+    return str(output_path)
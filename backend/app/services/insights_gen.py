@@ -1,16 +1,14 @@
-from typing import List
-from app.utils.schemas import Transaction
-from app.models.classifier import classify
+from typing import Optional
 
-def generate_insight(user_id: str, transactions: List) -> dict:
-    unnecessary_total = 0.0
 
-    for txn in transactions:
-        # normalize SQLAlchemy object into Pydantic Transaction
-        schema_txn = Transaction.from_orm(txn)
-        label = classify(schema_txn)
-        if label == "unnecessary":
-            unnecessary_total += schema_txn.amount
+def generate_insight(user_id: str, summary: dict, month: Optional[str] = None) -> dict:
+    """
+    Build the insight message from a per-classification spending summary
+    ({"necessary": {"total", "count"}, "unnecessary": {...}}), usually one
+    month read from the spending rollups.
+    """
+    unnecessary_total = summary["unnecessary"]["total"]
+    transactions_count = sum(bucket["count"] for bucket in summary.values())
 
     if unnecessary_total > 0:
         message = f"You spent ${unnecessary_total:.2f} on non-essentials last month."
@@ -18,9 +16,12 @@ def generate_insight(user_id: str, transactions: List) -> dict:
     else:
         message = "Great job! You had no unnecessary spending last month. 🎉"
 
-    return {
+    insight = {
         "user_id": user_id,
         "unnecessary_total": unnecessary_total,
-        "transactions_count": len(transactions),
+        "transactions_count": transactions_count,
         "insight": message
     }
+    if month is not None:
+        insight["month"] = month
+    return insight
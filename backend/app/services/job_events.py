@@ -0,0 +1,66 @@
+"""
+In-process pub/sub hub for video job status.
+
+update_job_status publishes every new status here (from render worker
+threads); SSE clients subscribe on the event loop and get each status as
+it happens, so watching a job costs no polling or filesystem access.
+Each subscriber has a small bounded queue: a client that falls behind
+drops its oldest statuses, which is fine because every status is a full
+snapshot.
+
+The hub only sees jobs rendered by this process. Subscribers on another
+uvicorn worker fall back to re-reading the job store between keepalives.
+"""
+import asyncio
+import threading
+from typing import Dict, Set, Tuple
+
+SUBSCRIBER_QUEUE_SIZE = 16
+
+_Subscriber = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+_subscribers: Dict[str, Set[_Subscriber]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(job_id: str) -> asyncio.Queue:
+    """Queue receiving every status published for job_id; call from the event loop"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _lock:
+        _subscribers.setdefault(job_id, set()).add((asyncio.get_running_loop(), queue))
+    return queue
+
+
+def unsubscribe(job_id: str, queue: asyncio.Queue) -> None:
+    with _lock:
+        subscribers = _subscribers.get(job_id)
+        if subscribers is None:
+            return
+        for subscriber in [s for s in subscribers if s[1] is queue]:
+            subscribers.discard(subscriber)
+        if not subscribers:
+            del _subscribers[job_id]
+
+
+def _offer(queue: asyncio.Queue, status: dict) -> None:
+    # runs on the subscriber's loop
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(status)
+
+
+def publish(job_id: str, status: dict) -> None:
+    """Hand status to every subscriber of job_id; safe to call from any thread"""
+    with _lock:
+        subscribers = list(_subscribers.get(job_id, ()))
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_offer, queue, status)
+        except RuntimeError:
+            # loop already closed (shutdown)
+            pass
+
+
+def subscriber_count() -> int:
+    with _lock:
+        return sum(len(s) for s in _subscribers.values())
@@ -0,0 +1,229 @@
+"""
+Durable store for financial-help video job status (the video_jobs table).
+
+Progress ticks are buffered per job and written in one batched upsert every
+FLUSH_INTERVAL_SEC by a background thread. New jobs and terminal states
+(completed, failed, cancelled, rejected) are written at once, so other
+uvicorn workers see them immediately and they survive restarts. Finished
+jobs older than JOB_TTL_SEC are pruned.
+"""
+import base64
+import datetime
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.database import SessionLocal
+from app.models.video_job import VideoJobDB
+
+FLUSH_INTERVAL_SEC = float(os.getenv("JOB_FLUSH_INTERVAL_SEC", "1.0"))
+JOB_TTL_SEC = float(os.getenv("JOB_TTL_SEC", str(7 * 24 * 3600)))
+PRUNE_INTERVAL_SEC = 3600.0
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "rejected")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_STATE_COLUMNS = ("status", "progress", "message", "updated_at", "video_ready",
+                  "voiceover_ready", "final_video_ready", "timings", "details")
+
+# job_id -> full row values not yet written
+_pending: Dict[str, dict] = {}
+# job_id -> last known row values of jobs this process updated
+_local: Dict[str, dict] = {}
+_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _row_to_status(row: dict) -> dict:
+    """Public status dict (the shape video-status has always returned)"""
+    status = {
+        "job_id": row["job_id"],
+        "status": row["status"],
+        "progress": row["progress"],
+        "message": row["message"] or "",
+        "updated_at": row["updated_at"].isoformat() if row["updated_at"] else "",
+        "video_ready": bool(row["video_ready"]),
+        "voiceover_ready": bool(row["voiceover_ready"]),
+        "final_video_ready": bool(row["final_video_ready"]),
+        "timings": row["timings"] or {},
+    }
+    status.update(row["details"] or {})
+    return status
+
+
+def _load(job_id: str) -> Optional[dict]:
+    with SessionLocal() as db:
+        job = db.get(VideoJobDB, job_id)
+        if job is None:
+            return None
+        return {column: getattr(job, column) for column in ("job_id", *_STATE_COLUMNS)}
+
+
+def _write(rows: List[dict]) -> None:
+    """Upsert full rows with one executemany; a row never overwrites a newer one"""
+    if not rows:
+        return
+    table = VideoJobDB.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["job_id"],
+        set_={column: stmt.excluded[column] for column in _STATE_COLUMNS},
+        # the flusher may commit a buffered progress row after a terminal
+        # update() has already written the job
+        where=stmt.excluded.updated_at >= table.c.updated_at,
+    )
+    with SessionLocal() as db:
+        db.execute(stmt, [{**row, "created_at": row.get("created_at", row["updated_at"])} for row in rows])
+        db.commit()
+
+
+def update(job_id: str, status: str, progress: int = 0, message: str = "",
+           timings: Optional[dict] = None, **fields) -> dict:
+    """
+    Record a status change. Flags (video_ready, voiceover_ready,
+    final_video_ready) and timings carry over unless given; any other keyword
+    (e.g. final_video_path) is stored in details. Returns the new status.
+    """
+    with _lock:
+        row = _local.get(job_id)
+    if row is None:
+        row = _load(job_id)
+    is_new = row is None
+    if is_new:
+        row = {"job_id": job_id, "video_ready": False, "voiceover_ready": False,
+               "final_video_ready": False, "timings": {}, "details": {}}
+    row = dict(row)
+
+    row.update({"status": status, "progress": progress, "message": message,
+                "updated_at": datetime.datetime.utcnow()})
+    if timings is not None:
+        row["timings"] = timings
+    for flag in ("video_ready", "voiceover_ready", "final_video_ready"):
+        if flag in fields:
+            row[flag] = bool(fields.pop(flag))
+    if fields:
+        row["details"] = {**(row["details"] or {}), **fields}
+
+    with _lock:
+        _local[job_id] = row
+        _pending[job_id] = row
+        flush_now = is_new or status in TERMINAL_STATUSES
+        if flush_now:
+            _pending.pop(job_id, None)
+            if status in TERMINAL_STATUSES:
+                # nothing more will change here; readers go to the table
+                _local.pop(job_id, None)
+    if flush_now:
+        _write([row])
+    _ensure_flusher()
+    return _row_to_status(row)
+
+
+def get(job_id: str) -> Optional[dict]:
+    """Current status of a job, or None if it is unknown"""
+    with _lock:
+        row = _local.get(job_id)
+    if row is None:
+        row = _load(job_id)
+    return _row_to_status(row) if row is not None else None
+
+
+def flush() -> int:
+    """Write buffered progress updates now; returns the number of jobs written"""
+    with _lock:
+        rows = list(_pending.values())
+        _pending.clear()
+    try:
+        _write(rows)
+    except Exception:
+        with _lock:
+            # retry on the next flush, unless the job has moved on meanwhile
+            for row in rows:
+                _pending.setdefault(row["job_id"], row)
+        raise
+    return len(rows)
+
+
+def prune(ttl_sec: float = JOB_TTL_SEC) -> int:
+    """Delete finished jobs last updated more than ttl_sec ago"""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=ttl_sec)
+    with SessionLocal() as db:
+        deleted = (
+            db.query(VideoJobDB)
+            .filter(VideoJobDB.status.in_(TERMINAL_STATUSES), VideoJobDB.updated_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    return deleted
+
+
+def _encode_cursor(updated_at: datetime.datetime, job_id: str) -> str:
+    payload = json.dumps({"u": updated_at.isoformat(), "j": job_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime.datetime, str]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.datetime.fromisoformat(payload["u"]), str(payload["j"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def list_jobs(status: Optional[str] = None, cursor: Optional[str] = None,
+              limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Most recently updated jobs first, optionally only one status, keyset
+    paginated on (updated_at, job_id). Returns {"items", "next_cursor"}.
+    """
+    flush()
+    with SessionLocal() as db:
+        query = db.query(VideoJobDB)
+        if status is not None:
+            query = query.filter(VideoJobDB.status == status)
+        if cursor is not None:
+            after_updated, after_id = _decode_cursor(cursor)
+            query = query.filter(
+                tuple_(VideoJobDB.updated_at, VideoJobDB.job_id)
+                < tuple_(literal(after_updated, VideoJobDB.updated_at.type), literal(after_id, VideoJobDB.job_id.type))
+            )
+        jobs = (
+            query.order_by(VideoJobDB.updated_at.desc(), VideoJobDB.job_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        rows = [{column: getattr(job, column) for column in ("job_id", *_STATE_COLUMNS)} for job in jobs]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]["updated_at"], rows[-1]["job_id"])
+    return {"items": [_row_to_status(row) for row in rows], "next_cursor": next_cursor}
+
+
+def _flush_loop() -> None:
+    last_prune = 0.0
+    while True:
+        time.sleep(FLUSH_INTERVAL_SEC)
+        try:
+            flush()
+            if time.monotonic() - last_prune > PRUNE_INTERVAL_SEC:
+                prune()
+                last_prune = time.monotonic()
+        except Exception as e:
+            print(f"[job-store] flush failed: {e}")
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="job-store-flusher", daemon=True)
+            _flusher.start()
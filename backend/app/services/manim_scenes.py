@@ -0,0 +1,127 @@
+"""
+Manim scenes rendered by the render worker pool (app/services/render_pool.py).
+
+The answer text is passed to the scene as a constructor argument, so no
+scene source is generated per job.
+
+FinancialHelpScene is the whole video. The intro (title write-on) and
+outro are the same for every answer, so they are also available as their
+own scenes, rendered once and cached (app/services/scene_segments.py);
+per job only FinancialHelpBody is rendered and the three are concatenated.
+"""
+from manim import *
+from app.services import scene_layout
+from app.services.scene_layout import (
+    CARD_FADE_IN_SEC, CARD_FADE_OUT_SEC, CARD_HOLD_SEC, CONTENT_Y, END_HOLD_SEC, FOOTER_Y,
+    OUTRO_FADE_IN_SEC, OUTRO_FADE_OUT_SEC, OUTRO_HOLD_SEC, OUTRO_TEXT, TITLE_HOLD_SEC,
+    TITLE_TEXT, TITLE_WRITE_SEC, TITLE_Y,
+)
+
+class FinancialHelpScene(Scene):
+    def __init__(self, text_content: str = "", card_holds=None, **kwargs):
+        super().__init__(**kwargs)
+        self.text_content = text_content
+        # seconds each card stays up (sized to its narration); None = CARD_HOLD_SEC
+        self.card_holds = card_holds
+    
+    def make_title(self):
+        # Create persistent title
+        title = Text(TITLE_TEXT, font_size=40, color=BLUE, weight=BOLD)
+        title.move_to([0, TITLE_Y, 0])
+        return title
+    
+    def play_intro(self, title):
+        # Scene 1: Title Introduction
+        self.play(Write(title), run_time=TITLE_WRITE_SEC)
+        self.wait(TITLE_HOLD_SEC)
+    
+    def play_body(self):
+        # One card per group of wrapped lines, in the same order as scene_layout.text_cards
+        for index, card_lines in enumerate(scene_layout.text_cards(self.text_content)):
+            text_objects = [Text(line, font_size=24, color=WHITE) for line in card_lines]
+            
+            # Arrange lines vertically in the content area
+            content_group = VGroup(*text_objects)
+            content_group.arrange(DOWN, buff=0.2, center=True)
+            content_group.move_to([0, CONTENT_Y, 0])
+            
+            # Ensure content fits within bounds
+            if content_group.height > 3.5:
+                scale_factor = 3.5 / content_group.height
+                content_group.scale(scale_factor)
+                content_group.move_to([0, CONTENT_Y, 0])
+            
+            # Create a subtle background for this content chunk
+            bg_rect = RoundedRectangle(
+                width=content_group.width + 1,
+                height=content_group.height + 0.8,
+                corner_radius=0.2,
+                color=DARK_GRAY,
+                fill_opacity=0.1,
+                stroke_opacity=0.3
+            )
+            bg_rect.move_to(content_group.get_center())
+            
+            # Add objects to scene and animate
+            self.add(bg_rect, content_group)
+            self.play(
+                FadeIn(bg_rect),
+                FadeIn(content_group),
+                run_time=CARD_FADE_IN_SEC
+            )
+            
+            # Display time for each chunk
+            self.wait(self.card_holds[index] if self.card_holds else CARD_HOLD_SEC)
+            
+            # Remove objects from scene before next chunk
+            self.play(
+                FadeOut(bg_rect),
+                FadeOut(content_group),
+                run_time=CARD_FADE_OUT_SEC
+            )
+            self.remove(bg_rect, content_group)
+    
+    def play_outro(self, title):
+        # Final scene: Summary
+        summary_text = Text(
+            OUTRO_TEXT,
+            font_size=24,
+            color=YELLOW,
+            slant=ITALIC
+        )
+        summary_text.move_to([0, FOOTER_Y, 0])
+        
+        self.play(FadeIn(summary_text), run_time=OUTRO_FADE_IN_SEC)
+        self.wait(OUTRO_HOLD_SEC)
+        
+        # Final fade out
+        self.play(
+            FadeOut(title),
+            FadeOut(summary_text),
+            run_time=OUTRO_FADE_OUT_SEC
+        )
+        self.wait(END_HOLD_SEC)
+    
+    def construct(self):
+        title = self.make_title()
+        self.play_intro(title)
+        self.play_body()
+        self.play_outro(title)
+
+class FinancialHelpIntro(FinancialHelpScene):
+    """Shared opening: ends with the title on screen"""
+    def construct(self):
+        self.play_intro(self.make_title())
+
+class FinancialHelpBody(FinancialHelpScene):
+    """Per-answer middle: the title is already on screen from the intro"""
+    def construct(self):
+        self.add(self.make_title())
+        self.play_body()
+
+class FinancialHelpOutro(FinancialHelpScene):
+    """Shared closing, starting from the title alone on screen"""
+    def construct(self):
+        title = self.make_title()
+        self.add(title)
+        self.play_outro(title)
@@ -0,0 +1,180 @@
+"""
+Background orchestration of monthly insight videos.
+
+POST /insights/monthly starts a job here and returns at once. Each job is a
+coroutine that requests a video from the ai-video backend and then waits on
+an asyncio future. The ai-video backend resolves the future by calling
+POST /insights/monthly/{job_id}/callback when the video is done. If no callback
+arrives, the job polls the video status every POLL_INTERVAL_SEC without
+blocking the event loop. The Insight row is written once the video is ready.
+Waiting jobs only hold a future, so one worker can run hundreds of them.
+
+The callback URL carries a random per-job token, and callbacks without it
+are refused, so knowing a job_id is not enough to inject a video URL.
+Finished jobs are forgotten JOB_TTL_SEC after they end.
+"""
+import asyncio
+import hmac
+import os
+import secrets
+import time
+import uuid
+from typing import Dict, Optional
+
+from app.core.database import AsyncSessionLocal
+from app.models import Insight
+from app.services import video_client
+
+# Push notifications - commented out for now
+# import random
+# from app.core.notifications import send_push_notification  # assumes you created this already
+
+# public base URL of this API, handed to the ai-video backend for the
+# completion webhook; without it jobs fall back to polling
+CALLBACK_BASE_URL = os.getenv("INSIGHTS_CALLBACK_URL")
+
+# fallback poll interval when no callback arrives, and the overall deadline
+POLL_INTERVAL_SEC = 15.0
+VIDEO_TIMEOUT_SEC = 600.0
+
+# how long a finished job stays readable via GET /insights/monthly/{job_id}
+JOB_TTL_SEC = float(os.getenv("INSIGHTS_JOB_TTL_SEC", "3600"))
+
+# orchestration job_id -> {"status", "user_id", "insight", "video_job_id", "video_url", "insight_id", "error"}
+jobs: Dict[str, dict] = {}
+
+# orchestration job id -> future resolved by the webhook with the video job payload
+_waiters: Dict[str, asyncio.Future] = {}
+
+# orchestration job id -> secret expected on its callback
+_callback_tokens: Dict[str, str] = {}
+
+# orchestration job id -> time.monotonic() when it finished
+_finished_at: Dict[str, float] = {}
+
+# keeps running tasks referenced until they finish
+_tasks: set = set()
+
+def start_monthly_job(user_id: str, insight_text: str) -> dict:
+    """Register a job, start it in the background and return its initial state"""
+    _prune_finished()
+    job_id = str(uuid.uuid4())
+    jobs[job_id] = {
+        "job_id": job_id,
+        "status": "queued",
+        "user_id": user_id,
+        "insight": insight_text,
+        "video_job_id": None,
+        "video_url": None,
+        "insight_id": None,
+        "error": None,
+    }
+    task = asyncio.create_task(_run(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return jobs[job_id]
+
+
+def _prune_finished() -> None:
+    """Forget jobs that finished more than JOB_TTL_SEC ago"""
+    cutoff = time.monotonic() - JOB_TTL_SEC
+    for job_id, finished in list(_finished_at.items()):
+        if finished < cutoff:
+            _finished_at.pop(job_id, None)
+            jobs.pop(job_id, None)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    _prune_finished()
+    return jobs.get(job_id)
+
+
+def video_callback(job_id: str, token: str, payload: dict) -> bool:
+    """
+    Webhook entry point: hand a finished video job's payload to the job
+    waiting for it. Returns False if that job is not waiting or token does
+    not match the one in its callback URL.
+    """
+    expected = _callback_tokens.get(job_id)
+    if expected is None or not hmac.compare_digest(expected, token or ""):
+        return False
+    future = _waiters.get(job_id)
+    if future is None or future.done():
+        return False
+    if payload.get("status") in ("ready", "error"):
+        future.set_result(payload)
+    return True
+
+
+def callback_url(job_id: str) -> Optional[str]:
+    if not CALLBACK_BASE_URL:
+        return None
+    token = _callback_tokens.setdefault(job_id, secrets.token_urlsafe(32))
+    return f"{CALLBACK_BASE_URL.rstrip('/')}/insights/monthly/{job_id}/callback?token={token}"
+
+
+async def wait_for_video(future: asyncio.Future, video_job_id: str) -> dict:
+    """Wait for the webhook to resolve future, checking the status ourselves every POLL_INTERVAL_SEC"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + VIDEO_TIMEOUT_SEC
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), min(POLL_INTERVAL_SEC, remaining))
+        except asyncio.TimeoutError:
+            pass
+        status = await video_client.get_video_status(video_job_id)
+        if status.get("status") in ("ready", "error"):
+            return status
+
+
+async def save_insight(user_id: str, text: str, video_url: str, video_job_id: str) -> int:
+    async with AsyncSessionLocal() as db:
+        db_insight = Insight(user_id=user_id, text=text, video_url=video_url, video_job_id=video_job_id)
+        db.add(db_insight)
+        await db.commit()
+        return db_insight.id
+
+
+async def _run(job_id: str) -> None:
+    job = jobs[job_id]
+    # registered before the request so an early callback cannot be missed
+    future = asyncio.get_running_loop().create_future()
+    _waiters[job_id] = future
+    try:
+        job["status"] = "requesting_video"
+        job["video_job_id"] = await video_client.request_video(job["insight"], callback_url(job_id))
+
+        job["status"] = "rendering"
+        result = await wait_for_video(future, job["video_job_id"])
+        if result.get("status") != "ready":
+            job.update({"status": "error", "error": result.get("error") or "video generation failed"})
+            return
+
+        job["video_url"] = result["url"]
+        job["insight_id"] = await save_insight(job["user_id"], job["insight"], result["url"], job["video_job_id"])
+        job["status"] = "ready"
+
+        # Send push notification (demo: static token, replace with lookup) - commented out for now
+        # clickbaits = [
+        #     "☕ You spent too much on coffee! Tap to see your story 🎥",
+        #     "🔥 Your wallet is crying… see how last month went 🚀",
+        #     "💸 You could've bought a MacBook by now. Proof inside 👀"
+        # ]
+        # fcm_token = "user-device-token"  # TODO: fetch from your Users table
+        # send_push_notification(
+        #     fcm_token,
+        #     title="Your Money Story is Ready!",
+        #     body=random.choice(clickbaits),
+        #     url=job["video_url"]
+        # )
+    except asyncio.TimeoutError:
+        job.update({"status": "timeout", "error": f"video not ready after {VIDEO_TIMEOUT_SEC:.0f}s"})
+    except Exception as e:
+        job.update({"status": "error", "error": str(e)})
+    finally:
+        _waiters.pop(job_id, None)
+        _callback_tokens.pop(job_id, None)
+        _finished_at[job_id] = time.monotonic()
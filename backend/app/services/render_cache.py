@@ -0,0 +1,155 @@
+"""
+Content-addressed cache of finished financial-help videos.
+
+Entries are keyed on a hash of everything that decides the rendered output
+(answer text, scene template version, render quality, voice id) and hold
+the final artefacts. A hit is materialised into the new job directory with
+hard links (copies across filesystems), so identical answers skip Manim,
+ElevenLabs and ffmpeg entirely.
+
+Entries older than RENDER_CACHE_MAX_AGE_SEC are dropped, and the least
+recently used ones go first when the cache grows past RENDER_CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CACHE_DIR = Path(os.getenv("RENDER_CACHE_DIR", "../htn-investEd/backend/render_cache"))
+MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+MAX_AGE_SEC = float(os.getenv("RENDER_CACHE_MAX_AGE_SEC", str(7 * 24 * 3600)))
+
+META_FILE = "meta.json"
+
+stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+_lock = threading.Lock()
+
+
+def cache_key(text: str, template_version: str, quality: str, voice_id: Optional[str]) -> str:
+    """sha256 over the inputs that determine the rendered video"""
+    payload = json.dumps([text, template_version, quality, voice_id or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def fetch(key: str, job_dir: Path) -> Optional[str]:
+    """
+    On a hit, link the cached artefacts into job_dir and return the path of
+    the result file there; on a miss return None.
+    """
+    entry = CACHE_DIR / key
+    meta_file = entry / META_FILE
+    with _lock:
+        if not meta_file.exists():
+            stats["misses"] += 1
+            return None
+        try:
+            meta = json.loads(meta_file.read_text())
+        except (OSError, ValueError):
+            stats["misses"] += 1
+            return None
+        if time.time() - meta.get("created", 0) > MAX_AGE_SEC:
+            shutil.rmtree(entry, ignore_errors=True)
+            stats["evictions"] += 1
+            stats["misses"] += 1
+            return None
+
+        job_dir.mkdir(parents=True, exist_ok=True)
+        for name in meta["artefacts"]:
+            _link_or_copy(entry / name, job_dir / name)
+        # last use drives LRU eviction
+        os.utime(meta_file)
+        stats["hits"] += 1
+    return str(job_dir / meta["result"])
+
+
+def store(key: str, result_path: str, artefact_paths: List[str]) -> None:
+    """
+    Copy a finished job's artefacts into the cache under key, then evict if
+    needed. result_path must be one of artefact_paths; files are stored by
+    name, so names must be unique.
+    """
+    paths = [Path(p) for p in artefact_paths if p and Path(p).is_file()]
+    result = Path(result_path)
+    if result not in paths:
+        return
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    staging = CACHE_DIR / f".tmp-{uuid.uuid4().hex}"
+    staging.mkdir()
+    try:
+        for path in paths:
+            _link_or_copy(path, staging / path.name)
+        (staging / META_FILE).write_text(json.dumps({
+            "created": time.time(),
+            "result": result.name,
+            "artefacts": [path.name for path in paths],
+        }))
+        with _lock:
+            entry = CACHE_DIR / key
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            # rename is atomic, so readers never see a half-written entry
+            os.replace(staging, entry)
+            stats["stores"] += 1
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    evict()
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+
+def evict() -> int:
+    """Drop expired entries, then least recently used ones until under MAX_BYTES"""
+    if not CACHE_DIR.exists():
+        return 0
+    removed = 0
+    now = time.time()
+    with _lock:
+        entries = []
+        for entry in CACHE_DIR.iterdir():
+            meta_file = entry / META_FILE
+            if entry.name.startswith(".") or not meta_file.exists():
+                continue
+            try:
+                created = json.loads(meta_file.read_text()).get("created", 0)
+                entries.append((meta_file.stat().st_mtime, created, _entry_size(entry), entry))
+            except (OSError, ValueError):
+                continue
+
+        total = sum(size for _, _, size, _ in entries)
+        for last_used, created, size, entry in sorted(entries, key=lambda e: e[0]):
+            if now - created <= MAX_AGE_SEC and total <= MAX_BYTES:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        stats["evictions"] += removed
+    return removed
+
+
+def get_stats() -> dict:
+    with _lock:
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            "max_bytes": MAX_BYTES,
+            "max_age_sec": MAX_AGE_SEC,
+        }
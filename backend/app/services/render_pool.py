@@ -0,0 +1,101 @@
+"""
+Pool of long-lived Manim render processes.
+
+Running the manim CLI per video pays interpreter startup plus the
+manim/numpy/cairo imports and config load every time, which dominates a
+short clip. The workers here import manim once when they start and then
+render scenes in-process, one job at a time each.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# CLI quality flag -> manim config quality name
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "k": "fourk_quality",
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Runs once per worker process: pay the heavy imports up front"""
+    import manim  # noqa: F401
+    from app.services import manim_scenes  # noqa: F401
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def _render_in_worker(scene_name: str, media_dir: str, quality: str, text_content: str = "",
+                      card_holds: Optional[List[float]] = None) -> str:
+    """Render a manim_scenes scene for text_content inside a worker; returns the mp4 path"""
+    from manim import tempconfig
+    from app.services import manim_scenes
+
+    with tempconfig({
+        "media_dir": media_dir,
+        "quality": QUALITIES[quality],
+        "disable_caching": True,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }):
+        scene = getattr(manim_scenes, scene_name)(text_content=text_content, card_holds=card_holds)
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn, not fork: the API process has threads and an event loop
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def start() -> None:
+    """Start every worker now so the first videos do not pay the imports"""
+    executor = get_executor()
+    for future in [executor.submit(_warm) for _ in range(RENDER_WORKERS)]:
+        future.result()
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def render_scene(scene_name: str, media_dir: str, quality: str = "l", text_content: str = "",
+                 card_holds: Optional[List[float]] = None) -> str:
+    """Render a scene on a warm worker and block until the video file is written"""
+    args = (_render_in_worker, scene_name, media_dir, quality, text_content, card_holds)
+    try:
+        return get_executor().submit(*args).result()
+    except BrokenProcessPool:
+        # a worker died (e.g. OOM); replace the pool and try once more
+        shutdown()
+        return get_executor().submit(*args).result()
+
+
+def render_financial_help(text_content: str, media_dir: str, quality: str = "l",
+                          card_holds: Optional[List[float]] = None) -> str:
+    """Render the whole FinancialHelpScene (intro, answer and outro) in one go"""
+    return render_scene("FinancialHelpScene", media_dir, quality, text_content, card_holds)
@@ -0,0 +1,160 @@
+"""
+Bounded, prioritised queue for video render jobs.
+
+A fixed set of worker threads (RENDER_QUEUE_WORKERS, default the render pool
+size) takes jobs off the queue, so the API event loop never runs a render
+and at most that many renders compete for the CPU. Interactive questions
+are served before batch jobs; within a class, jobs run in submission
+order. When RENDER_QUEUE_MAX jobs are already waiting, submit raises
+QueueFull so the API can answer 429 instead of piling up work.
+
+Queued jobs can be cancelled outright. Running jobs get their cancel event
+set, and the pipeline stops at its next stage boundary.
+
+Job functions return the job's final status ("completed", "failed" or
+"cancelled"), which is what stats counts. None means the job handed off
+to a follow-up job under the same id, which is counted instead.
+"""
+import heapq
+import itertools
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services import render_pool
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITIES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+RENDER_QUEUE_WORKERS = int(os.getenv("RENDER_QUEUE_WORKERS", str(render_pool.RENDER_WORKERS)))
+RENDER_QUEUE_MAX = int(os.getenv("RENDER_QUEUE_MAX", "100"))
+
+
+class QueueFull(Exception):
+    def __init__(self, queued: int):
+        super().__init__(f"Render queue is full ({queued} jobs waiting)")
+        self.queued = queued
+
+
+class _Job:
+    def __init__(self, job_id: str, priority: int, fn: Callable, args: tuple):
+        self.job_id = job_id
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.cancel_event = threading.Event()
+
+
+class RenderQueue:
+    def __init__(self, workers: int = RENDER_QUEUE_WORKERS, max_queued: int = RENDER_QUEUE_MAX):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._heap: List[Tuple[int, int, _Job]] = []
+        self._queued: Dict[str, _Job] = {}
+        self._running: Dict[str, _Job] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def _ensure_workers(self) -> None:
+        # caller holds the condition
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"render-queue-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def is_full(self) -> bool:
+        with self._cond:
+            return len(self._queued) >= self.max_queued
+
+    def submit(self, job_id: str, fn: Callable, *args, priority: int = INTERACTIVE) -> int:
+        """
+        Queue fn(*args, cancel_event) under job_id; fn returns the job's final
+        status (see module docstring). Returns the 1-based queue position;
+        raises QueueFull when max_queued jobs are already waiting.
+        """
+        with self._cond:
+            if len(self._queued) >= self.max_queued:
+                self.stats["rejected"] += 1
+                raise QueueFull(len(self._queued))
+            job = _Job(job_id, priority, fn, args)
+            self._queued[job_id] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self.stats["submitted"] += 1
+            self._ensure_workers()
+            self._cond.notify()
+            return self._position(job)
+
+    def _position(self, job: _Job) -> int:
+        # caller holds the condition; O(queue) but the queue is bounded
+        key = next((p, s) for p, s, j in self._heap if j is job)
+        return 1 + sum(1 for p, s, j in self._heap if (p, s) < key and j.job_id in self._queued)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position among waiting jobs, 0 while running, None if unknown or finished"""
+        with self._cond:
+            if job_id in self._running:
+                return 0
+            job = self._queued.get(job_id)
+            return self._position(job) if job is not None else None
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job: "cancelled" if it was still queued, "cancelling" if it is
+        running (it stops at its next stage), None if unknown or finished.
+        """
+        with self._cond:
+            job = self._queued.pop(job_id, None)
+            if job is not None:
+                # left in the heap and skipped when popped
+                job.cancel_event.set()
+                self.stats["cancelled"] += 1
+                return "cancelled"
+            job = self._running.get(job_id)
+            if job is not None:
+                job.cancel_event.set()
+                return "cancelling"
+            return None
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, job = heapq.heappop(self._heap)
+                    if self._queued.pop(job.job_id, None) is job:
+                        self._running[job.job_id] = job
+                        return job
+                self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            try:
+                outcome = job.fn(*job.args, job.cancel_event)
+            except Exception as e:
+                print(f"[render-queue] job {job.job_id} failed: {e}")
+                outcome = "failed"
+            with self._cond:
+                # a follow-up job under the same id may already be running
+                if self._running.get(job.job_id) is job:
+                    del self._running[job.job_id]
+                if outcome in ("completed", "failed", "cancelled"):
+                    self.stats[outcome] += 1
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                **self.stats,
+                "queued": len(self._queued),
+                "running": len(self._running),
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+            }
+
+
+# shared instance used by the financial-help API
+render_queue = RenderQueue()
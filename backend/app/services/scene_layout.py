@@ -0,0 +1,150 @@
+"""
+Layout of the financial-help video, shared by both render engines: the
+Manim scenes (app/services/manim_scenes.py) and the frame compositor
+(app/services/compositor.py). No Manim import here.
+
+Positions are in Manim scene units: the frame is 8 units high and
+centred on the origin.
+"""
+import math
+import re
+
+# Define the layout grid
+TITLE_Y = 3    # Top area
+CONTENT_Y = 0  # Middle area (center)
+FOOTER_Y = -3  # Bottom area
+
+TITLE_TEXT = "Financial Help"
+OUTRO_TEXT = "Need more help? Ask another question!"
+
+# seconds, matching the animations in FinancialHelpScene
+TITLE_WRITE_SEC = 1.5
+TITLE_HOLD_SEC = 1.0
+CARD_FADE_IN_SEC = 1.5
+CARD_HOLD_SEC = 3.0
+CARD_FADE_OUT_SEC = 0.8
+OUTRO_FADE_IN_SEC = 1.5
+OUTRO_HOLD_SEC = 2.0
+OUTRO_FADE_OUT_SEC = 1.5
+END_HOLD_SEC = 0.5
+
+# audio-driven timing: a card stays up until its narration has finished
+NARRATION_PAD_SEC = 0.3
+CARD_MIN_HOLD_SEC = 1.0
+
+
+def chunk_text(text, max_chars_per_chunk=150):
+    """Split text into logical chunks based on sentences and length"""
+    # Split by sentences first
+    sentences = re.split(r'(?<=[.!?])' + r'\s+', text)
+    chunks = []
+    current_chunk = ""
+    
+    for sentence in sentences:
+        # If adding this sentence would exceed max length, start new chunk
+        if len(current_chunk + " " + sentence) > max_chars_per_chunk and current_chunk:
+            chunks.append(current_chunk.strip())
+            current_chunk = sentence
+        else:
+            current_chunk += " " + sentence if current_chunk else sentence
+    
+    # Add the last chunk if it exists
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    
+    return chunks
+
+
+def create_grid_text_chunks(text, max_width=35, max_lines_per_chunk=3):
+    """Create multiple text chunks that fit within grid cells with proper line wrapping"""
+    words = text.split()
+    lines = []
+    current_line = ""
+    
+    # First, create all lines
+    for word in words:
+        if len(current_line + " " + word) <= max_width:
+            current_line += " " + word if current_line else word
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    
+    if current_line:
+        lines.append(current_line)
+    
+    # Now split lines into chunks of max_lines_per_chunk
+    chunks = []
+    for i in range(0, len(lines), max_lines_per_chunk):
+        chunk_lines = lines[i:i + max_lines_per_chunk]
+        chunks.append(chunk_lines)
+    
+    return chunks
+
+
+def chunk_cards(text):
+    """
+    (chunk, cards) per sentence-aligned chunk, where cards are the line
+    groups the chunk is shown as (empty lines and chunks dropped)
+    """
+    chunks = []
+    for chunk in chunk_text(text):
+        cards = []
+        for sub_chunk_lines in create_grid_text_chunks(chunk, max_width=35, max_lines_per_chunk=3):
+            lines = [line.strip() for line in sub_chunk_lines if line.strip()]
+            if lines:
+                cards.append(lines)
+        if cards:
+            chunks.append((chunk, cards))
+    return chunks
+
+
+def text_cards(text):
+    """The line groups shown one card at a time, in order (empty lines dropped)"""
+    return [card for _, cards in chunk_cards(text) for card in cards]
+
+
+def frame_count(seconds, fps):
+    """
+    Frames an animation or wait of this length renders to: the length of
+    Manim's np.arange(0, seconds, 1 / fps). The compositor counts the same way.
+    """
+    return max(0, math.ceil(seconds / (1 / fps)))
+
+
+def narration_timeline(narration_durations, chunk_card_lines, fps):
+    """
+    (hold per card, start time per narration clip) for audio-driven timing.
+
+    A chunk's clip starts as its first card fades in. The clip is shared
+    between the chunk's cards by how much text each shows: a card starts
+    fading in as its words begin and has faded out as they end, except the
+    chunk's last card, which only fades out once the clip (plus a short
+    pause) is over. Everything is counted in whole frames at fps, as the
+    engines render it, so clip offsets do not drift from the cards.
+
+    narration_durations: seconds of narration per chunk
+    chunk_card_lines: the cards of each chunk, as from chunk_cards
+    """
+    fade_frames = frame_count(CARD_FADE_IN_SEC, fps) + frame_count(CARD_FADE_OUT_SEC, fps)
+    min_hold_frames = frame_count(CARD_MIN_HOLD_SEC, fps)
+    frame = frame_count(TITLE_WRITE_SEC, fps) + frame_count(TITLE_HOLD_SEC, fps)
+    holds, offsets = [], []
+    for duration, cards in zip(narration_durations, chunk_card_lines):
+        chunk_start = frame
+        offsets.append(chunk_start / fps)
+        sizes = [sum(len(line) for line in lines) for lines in cards]
+        spoken = 0.0
+        for index, size in enumerate(sizes):
+            spoken += duration * size / sum(sizes)
+            if index == len(sizes) - 1:
+                # hold until the narration and a pause are over, then fade out
+                end = chunk_start + math.ceil((spoken + NARRATION_PAD_SEC) * fps) + frame_count(CARD_FADE_OUT_SEC, fps)
+            else:
+                # the next card fades in as its own words begin
+                end = chunk_start + math.ceil(spoken * fps)
+            hold_frames = max(min_hold_frames, end - frame - fade_frames)
+            # half a frame short, so frame_count() lands on hold_frames despite float error
+            holds.append((hold_frames - 0.5) / fps)
+            frame += fade_frames + hold_frames
+    return holds, offsets
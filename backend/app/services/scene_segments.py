@@ -0,0 +1,82 @@
+"""
+Shared intro/outro segments and stream-copy assembly of financial-help videos.
+
+The title write-on and the closing "Ask another question!" are identical
+in every video. They are rendered once per scene template version and
+quality, kept under SEGMENTS_DIR, and joined to each job's answer body
+with ffmpeg's concat demuxer (-c copy), so a job only rasterises its own
+frames. All three segments come from the same renderer config, so their
+streams match and concatenating them needs no re-encode.
+"""
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from app.services import render_cache, render_pool
+
+SEGMENTS_DIR = Path(os.getenv("SCENE_SEGMENTS_DIR", str(render_cache.CACHE_DIR / "segments")))
+
+# segment name -> manim_scenes class
+SHARED_SEGMENTS = {
+    "intro": "FinancialHelpIntro",
+    "outro": "FinancialHelpOutro",
+}
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+def _segment_lock(path: Path) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(str(path), threading.Lock())
+
+
+def get_segment(name: str, template_version: str, quality: str) -> str:
+    """Path of the shared segment, rendering it on the worker pool the first time"""
+    path = SEGMENTS_DIR / f"{name}-v{template_version}-{quality}.mp4"
+    if path.exists():
+        return str(path)
+    # one render per segment in this process; other jobs wait for it
+    with _segment_lock(path):
+        if path.exists():
+            return str(path)
+        SEGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        media_dir = SEGMENTS_DIR / f".render-{uuid.uuid4().hex}"
+        try:
+            rendered = render_pool.render_scene(SHARED_SEGMENTS[name], str(media_dir), quality)
+            # rename is atomic: other processes see the whole file or none
+            os.replace(rendered, path)
+        finally:
+            shutil.rmtree(media_dir, ignore_errors=True)
+    return str(path)
+
+
+def concat(segment_paths: List[str], output_path: str) -> str:
+    """Join segments with the ffmpeg concat demuxer, copying streams"""
+    output = Path(output_path)
+    list_file = output.with_name(f".{output.name}.concat.txt")
+    # concat demuxer syntax: one "file '<path>'" line per segment
+    list_file.write_text("".join(
+        "file '{}'\n".format(str(Path(p).resolve()).replace("'", "'\\''")) for p in segment_paths
+    ))
+    try:
+        cmd = [
+            "ffmpeg",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(list_file),
+            "-c", "copy",
+            "-movflags", "+faststart",
+            "-y",
+            str(output)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg concat failed: {result.stderr}")
+    finally:
+        list_file.unlink(missing_ok=True)
+    return str(output)
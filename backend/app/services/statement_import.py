@@ -0,0 +1,150 @@
+import csv
+import json
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.services import transaction_crud
+from app.utils.schemas import Transaction
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+# only the first few bad rows are kept so a broken file cannot grow memory
+MAX_REPORTED_ERRORS = 100
+
+# report progress every this many rows
+PROGRESS_EVERY = 10000
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Guess the statement format from a file name"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def iter_csv_records(stream: TextIO) -> Iterator[Tuple[int, object]]:
+    """Yield (row_number, dict) for each CSV data row; empty cells become None"""
+    reader = csv.DictReader(stream)
+    for index, row in enumerate(reader):
+        yield index, {key: (value if value != "" else None) for key, value in row.items() if key}
+
+
+def iter_ndjson_records(stream: TextIO) -> Iterator[Tuple[int, object]]:
+    """Yield (line_number, dict) for each non-blank NDJSON line, or the parse error"""
+    for index, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield index, e
+
+
+def validate_records(
+    records: Iterable[Tuple[int, object]],
+    errors: List[dict],
+    stats: dict,
+    user_id: Optional[str] = None,
+) -> Iterator[Tuple[int, Transaction]]:
+    """Turn raw records into (row index, Transaction), collecting bad rows into errors"""
+    for index, record in records:
+        stats["rows"] += 1
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"Invalid JSON: {record}")
+            if not isinstance(record, dict):
+                raise ValueError("Row is not an object")
+            if user_id and not record.get("user_id"):
+                record["user_id"] = user_id
+            yield index, Transaction.model_validate(record)
+        except (ValidationError, ValueError) as e:
+            stats["failed"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"index": index, "error": str(e)})
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most size items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_statement(
+    db: Session,
+    stream: TextIO,
+    fmt: str,
+    user_id: Optional[str] = None,
+    batch_size: int = transaction_crud.BULK_BATCH_SIZE,
+    progress_callback: Optional[Callable[[dict], None]] = None,
+    resume_after: Optional[int] = None,
+) -> dict:
+    """
+    Stream a CSV or NDJSON statement into the transactions table.
+
+    The file is read row by row and flushed to the database in fixed-size
+    batches, so memory use does not depend on the size of the file. Each
+    batch commits on its own. If the file cannot be decoded or a batch cannot
+    be written, the open batch is rolled back and the import stops; the
+    summary then has "aborted" (the failed row range) and "resume_after" (the
+    last committed row). Passing that back as resume_after skips the rows
+    already imported.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {SUPPORTED_FORMATS}")
+
+    records = iter_csv_records(stream) if fmt == "csv" else iter_ndjson_records(stream)
+    if resume_after is not None:
+        records = ((index, record) for index, record in records if index > resume_after)
+    errors: List[dict] = []
+    stats = {"rows": 0, "inserted": 0, "failed": 0, "resume_after": resume_after, "aborted": None}
+    started = time.perf_counter()
+    next_report = PROGRESS_EVERY
+
+    def snapshot() -> dict:
+        elapsed = time.perf_counter() - started
+        return {
+            **stats,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def abort(reason: str, from_index: int, to_index: Optional[int], error: Exception) -> None:
+        db.rollback()
+        stats["aborted"] = {"reason": reason, "from_index": from_index, "to_index": to_index, "error": str(error)}
+
+    try:
+        for batch in batched(validate_records(records, errors, stats, user_id), batch_size):
+            try:
+                result = transaction_crud.create_transactions_bulk(db, [txn for _, txn in batch], batch_size=batch_size)
+            except SQLAlchemyError as e:
+                abort("database", batch[0][0], batch[-1][0], e)
+                break
+            stats["inserted"] += result["inserted"]
+            stats["resume_after"] = batch[-1][0]
+
+            if progress_callback and stats["rows"] >= next_report:
+                progress_callback(snapshot())
+                next_report = stats["rows"] + PROGRESS_EVERY
+    except (UnicodeDecodeError, csv.Error) as e:
+        # rows read since the last commit were never written; the rest of the file is unknown
+        committed = stats["resume_after"]
+        abort("decode", committed + 1 if committed is not None else 0, None, e)
+
+    summary = snapshot()
+    summary["errors"] = errors
+    if progress_callback:
+        progress_callback(summary)
+    return summary
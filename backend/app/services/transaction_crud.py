@@ -1,11 +1,125 @@
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, insert, literal, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
+from app.models.classifier import classify, classify_batch
+from app.models.spending_rollup import SpendingRollupDB
 from app.models.transaction_db import TransactionDB
 from app.utils.schemas import Transaction
 
-def get_transactions(db: Session, user_id: str):
-    results = db.query(TransactionDB).filter(TransactionDB.user_id == user_id).all() # debug stat
-    print(f"[DEBUG] Found {len(results)} transactions for user_id={user_id}") # debug
-    return results
+# rows per executemany call for bulk inserts
+BULK_BATCH_SIZE = 1000
+
+# page size bounds for GET /transactions
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+CLASSIFICATIONS = ("necessary", "unnecessary")
+
+# (user_id, month, category, classification) -> [total, count]
+RollupDeltas = Dict[Tuple[str, str, str, str], List[float]]
+
+def encode_cursor(date: datetime, txn_id: int) -> str:
+    """Opaque keyset cursor for the (date, id) of the last row on a page"""
+    payload = json.dumps({"d": date.isoformat(), "i": txn_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["d"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def get_transactions(
+    db: Session,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> dict:
+    """
+    One page of a user's transactions, newest first, optionally limited to
+    start <= date < end.
+
+    Pages are keyset-paginated on (date, id): the cursor holds the last row
+    of the previous page and the next page starts strictly after it, so the
+    (user_id, date) index serves every page at the same cost however deep
+    the client scrolls. Returns {"items", "next_cursor"}.
+    """
+    query = db.query(TransactionDB).filter(TransactionDB.user_id == user_id)
+    if start is not None:
+        query = query.filter(TransactionDB.date >= start)
+    if end is not None:
+        query = query.filter(TransactionDB.date < end)
+    if cursor is not None:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(TransactionDB.date, TransactionDB.id)
+            < tuple_(literal(after_date, TransactionDB.date.type), literal(after_id, TransactionDB.id.type))
+        )
+
+    # fetch one extra row to learn whether another page exists
+    rows = query.order_by(TransactionDB.date.desc(), TransactionDB.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def month_key(date: Optional[datetime]) -> str:
+    """Rollup bucket for a transaction date, e.g. "2025-08" """
+    return (date or datetime.utcnow()).strftime("%Y-%m")
+
+
+def _add_rollup_delta(
+    deltas: RollupDeltas,
+    user_id: str,
+    date: Optional[datetime],
+    category: Optional[str],
+    classification: Optional[str],
+    amount: float,
+    sign: int = 1,
+) -> None:
+    """Accumulate one transaction (sign=-1 to remove it) into pending rollup changes"""
+    bucket = deltas[(user_id, month_key(date), category or "", classification or "")]
+    bucket[0] += sign * (amount or 0.0)
+    bucket[1] += sign
+
+
+def _apply_rollup_deltas(db: Session, deltas: RollupDeltas) -> None:
+    """
+    Upsert accumulated changes into spending_rollups with one executemany.
+    Runs in the caller's transaction, so rollups commit together with the rows.
+    """
+    rows = [
+        {"user_id": user_id, "month": month, "category": category,
+         "classification": classification, "total": total, "count": count}
+        for (user_id, month, category, classification), (total, count) in deltas.items()
+        if count or total
+    ]
+    if not rows:
+        return
+    stmt = sqlite_insert(SpendingRollupDB.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "month", "category", "classification"],
+        set_={
+            "total": SpendingRollupDB.__table__.c.total + stmt.excluded.total,
+            "count": SpendingRollupDB.__table__.c.count + stmt.excluded.count,
+        },
+    )
+    db.execute(stmt, rows)
 
 
 def create_transaction(db: Session, txn: Transaction):
@@ -15,9 +129,252 @@ def create_transaction(db: Session, txn: Transaction):
         amount=txn.amount,
         date=txn.date,
         description=txn.description,
-        category=txn.category
+        category=txn.category,
+        classification=classify(txn)
     )
     db.add(db_txn)
+    deltas: RollupDeltas = defaultdict(lambda: [0.0, 0])
+    _add_rollup_delta(deltas, txn.user_id, txn.date, txn.category, db_txn.classification, txn.amount)
+    _apply_rollup_deltas(db, deltas)
     db.commit()
     db.refresh(db_txn)
     return db_txn
+
+
+def create_transactions(db: Session, txns: List[Transaction]) -> List[TransactionDB]:
+    """
+    Insert already validated transactions with a single commit and return the
+    ORM rows (ids populated). Used by the TransactionWriter to group commit
+    concurrent single-row writes.
+    """
+    db_txns = [
+        TransactionDB(**_transaction_row(txn, label))
+        for txn, label in zip(txns, classify_batch(txns))
+    ]
+    db.add_all(db_txns)
+
+    deltas: RollupDeltas = defaultdict(lambda: [0.0, 0])
+    for db_txn in db_txns:
+        _add_rollup_delta(deltas, db_txn.user_id, db_txn.date, db_txn.category, db_txn.classification, db_txn.amount)
+    _apply_rollup_deltas(db, deltas)
+    db.commit()
+    return db_txns
+
+
+def _transaction_row(txn: Transaction, classification: str) -> dict:
+    """Column values for a core INSERT of one transaction"""
+    return {
+        "user_id": txn.user_id,
+        "merchant": txn.merchant,
+        "amount": txn.amount,
+        "date": txn.date,
+        "description": txn.description,
+        "category": txn.category,
+        "classification": classification,
+    }
+
+
+def _insert_chunk(db: Session, chunk: List[Transaction]) -> int:
+    """Label and insert one chunk with a single executemany, then fold it into the rollups"""
+    rows = [_transaction_row(txn, label) for txn, label in zip(chunk, classify_batch(chunk))]
+    db.execute(insert(TransactionDB), rows)
+
+    deltas: RollupDeltas = defaultdict(lambda: [0.0, 0])
+    for row in rows:
+        _add_rollup_delta(deltas, row["user_id"], row["date"], row["category"], row["classification"], row["amount"])
+    _apply_rollup_deltas(db, deltas)
+    return len(rows)
+
+
+def create_transactions_bulk(
+    db: Session,
+    txns: Iterable[Union[Transaction, Dict[str, Any]]],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> dict:
+    """
+    Insert many transactions in chunked executemany batches and one commit.
+
+    Rows may be Transaction objects or raw dicts; dicts are validated here so
+    one bad row is reported by its index instead of rejecting the whole batch.
+    Valid rows are only visible once the single commit at the end succeeds.
+    """
+    inserted = 0
+    errors: List[dict] = []
+    chunk: List[Transaction] = []
+
+    for index, txn in enumerate(txns):
+        try:
+            if not isinstance(txn, Transaction):
+                txn = Transaction.model_validate(txn)
+        except ValidationError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+
+        chunk.append(txn)
+        if len(chunk) >= batch_size:
+            inserted += _insert_chunk(db, chunk)
+            chunk = []
+
+    if chunk:
+        inserted += _insert_chunk(db, chunk)
+
+    db.commit()
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
+
+
+def reclassify_transactions(
+    db: Session,
+    user_id: Optional[str] = None,
+    only_missing: bool = False,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> int:
+    """
+    Recompute stored classification labels, e.g. after the keyword rules change.
+
+    Walks the table in primary-key order one batch at a time, writes only the
+    labels that actually changed and commits per batch; the spending rollups
+    are moved between classification buckets in the same commit. Returns the
+    number of rows updated.
+    """
+    table = TransactionDB.__table__
+    update_stmt = (
+        table.update()
+        .where(table.c.id == bindparam("_id"))
+        .values(classification=bindparam("_label"))
+    )
+
+    updated = 0
+    last_id = 0
+    while True:
+        query = db.query(
+            TransactionDB.id,
+            TransactionDB.user_id,
+            TransactionDB.merchant,
+            TransactionDB.description,
+            TransactionDB.amount,
+            TransactionDB.date,
+            TransactionDB.category,
+            TransactionDB.classification,
+        ).filter(TransactionDB.id > last_id)
+        if user_id is not None:
+            query = query.filter(TransactionDB.user_id == user_id)
+        if only_missing:
+            query = query.filter(TransactionDB.classification.is_(None))
+        rows = query.order_by(TransactionDB.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        changes = []
+        deltas: RollupDeltas = defaultdict(lambda: [0.0, 0])
+        for row, label in zip(rows, classify_batch(rows)):
+            if row.classification == label:
+                continue
+            changes.append({"_id": row.id, "_label": label})
+            _add_rollup_delta(deltas, row.user_id, row.date, row.category, row.classification, row.amount, sign=-1)
+            _add_rollup_delta(deltas, row.user_id, row.date, row.category, label, row.amount)
+        if changes:
+            db.execute(update_stmt, changes)
+            _apply_rollup_deltas(db, deltas)
+            db.commit()
+            updated += len(changes)
+        last_id = rows[-1].id
+
+    return updated
+
+
+def summarize_spending(
+    db: Session,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> dict:
+    """
+    Total and count per classification for a user, optionally limited to
+    start <= date < end. One GROUP BY query over the stored labels.
+    """
+    query = db.query(
+        TransactionDB.classification,
+        func.coalesce(func.sum(TransactionDB.amount), 0.0),
+        func.count(TransactionDB.id),
+    ).filter(TransactionDB.user_id == user_id)
+    if start is not None:
+        query = query.filter(TransactionDB.date >= start)
+    if end is not None:
+        query = query.filter(TransactionDB.date < end)
+
+    summary = {label: {"total": 0.0, "count": 0} for label in CLASSIFICATIONS}
+    for label, total, count in query.group_by(TransactionDB.classification):
+        if label in summary:
+            summary[label] = {"total": float(total), "count": count}
+    return summary
+
+
+def rebuild_rollups(db: Session, user_id: Optional[str] = None) -> int:
+    """
+    Recompute spending_rollups from the transactions table, for one user or
+    everyone. Replaces the affected rollup rows in a single commit and
+    returns the number of rollup rows written.
+    """
+    month = func.strftime("%Y-%m", TransactionDB.date)
+    category = func.coalesce(TransactionDB.category, "")
+    classification = func.coalesce(TransactionDB.classification, "")
+    query = db.query(
+        TransactionDB.user_id,
+        month,
+        category,
+        classification,
+        func.coalesce(func.sum(TransactionDB.amount), 0.0),
+        func.count(TransactionDB.id),
+    )
+    delete_query = db.query(SpendingRollupDB)
+    if user_id is not None:
+        query = query.filter(TransactionDB.user_id == user_id)
+        delete_query = delete_query.filter(SpendingRollupDB.user_id == user_id)
+
+    rows = [
+        {"user_id": uid, "month": m, "category": cat, "classification": label,
+         "total": float(total), "count": count}
+        for uid, m, cat, label, total, count in query.group_by(TransactionDB.user_id, month, category, classification)
+    ]
+    delete_query.delete(synchronize_session=False)
+    for start in range(0, len(rows), BULK_BATCH_SIZE):
+        db.execute(insert(SpendingRollupDB), rows[start:start + BULK_BATCH_SIZE])
+    db.commit()
+    return len(rows)
+
+
+def ensure_rollups(db: Session) -> int:
+    """Build the rollups once when the table is empty but transactions exist (e.g. after upgrading)"""
+    if db.query(SpendingRollupDB.id).first() is not None:
+        return 0
+    if db.query(TransactionDB.id).first() is None:
+        return 0
+    return rebuild_rollups(db)
+
+
+def latest_rollup_month(db: Session, user_id: str) -> Optional[str]:
+    """Most recent "YYYY-MM" with spending for a user, or None"""
+    return (
+        db.query(func.max(SpendingRollupDB.month))
+        .filter(SpendingRollupDB.user_id == user_id, SpendingRollupDB.count > 0)
+        .scalar()
+    )
+
+
+def summarize_month(db: Session, user_id: str, month: str) -> dict:
+    """
+    Same shape as summarize_spending, but for one "YYYY-MM" month read from
+    spending_rollups, so it costs one row per category instead of one per
+    transaction.
+    """
+    query = db.query(
+        SpendingRollupDB.classification,
+        func.coalesce(func.sum(SpendingRollupDB.total), 0.0),
+        func.coalesce(func.sum(SpendingRollupDB.count), 0),
+    ).filter(SpendingRollupDB.user_id == user_id, SpendingRollupDB.month == month)
+
+    summary = {label: {"total": 0.0, "count": 0} for label in CLASSIFICATIONS}
+    for label, total, count in query.group_by(SpendingRollupDB.classification):
+        if label in summary:
+            summary[label] = {"total": float(total), "count": int(count)}
+    return summary
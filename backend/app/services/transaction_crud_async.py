@@ -0,0 +1,54 @@
+"""
+Async counterparts of transaction_crud for the async routes.
+
+Each function runs the sync implementation through AsyncSession.run_sync,
+so the SQL lives in one place while every query is awaited over aiosqlite
+instead of blocking the event loop.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import transaction_crud
+from app.utils.schemas import Transaction
+
+
+async def get_transactions(
+    db: AsyncSession,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = transaction_crud.DEFAULT_PAGE_SIZE,
+) -> dict:
+    return await db.run_sync(transaction_crud.get_transactions, user_id, start, end, cursor, limit)
+
+
+async def create_transaction(db: AsyncSession, txn: Transaction):
+    return await db.run_sync(transaction_crud.create_transaction, txn)
+
+
+async def create_transactions_bulk(
+    db: AsyncSession,
+    txns: Iterable[Union[Transaction, Dict[str, Any]]],
+    batch_size: int = transaction_crud.BULK_BATCH_SIZE,
+) -> dict:
+    return await db.run_sync(transaction_crud.create_transactions_bulk, txns, batch_size)
+
+
+async def summarize_spending(
+    db: AsyncSession,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> dict:
+    return await db.run_sync(transaction_crud.summarize_spending, user_id, start, end)
+
+
+async def latest_rollup_month(db: AsyncSession, user_id: str) -> Optional[str]:
+    return await db.run_sync(transaction_crud.latest_rollup_month, user_id)
+
+
+async def summarize_month(db: AsyncSession, user_id: str, month: str) -> dict:
+    return await db.run_sync(transaction_crud.summarize_month, user_id, month)
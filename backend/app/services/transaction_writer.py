@@ -0,0 +1,110 @@
+"""
+Single background writer that group-commits concurrent transaction writes.
+
+SQLite allows one writer at a time, so many requests each committing their
+own row mostly wait on the write lock (or fail with "database is locked").
+Routes submit rows to the writer instead; it drains whatever has queued up
+while the previous commit ran and writes it with one commit, so the fsync
+and lock cost is shared by the whole group.
+"""
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.core.database import AsyncSessionLocal
+from app.services import transaction_crud
+from app.utils.schemas import Transaction
+
+# most rows written by one commit
+MAX_GROUP_SIZE = 500
+
+
+class TransactionWriter:
+    def __init__(self, session_factory=AsyncSessionLocal, max_group_size: int = MAX_GROUP_SIZE):
+        self.session_factory = session_factory
+        self.max_group_size = max_group_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # set by stop(): new rows go straight to the database instead
+        self._stopping = False
+        self.commits = 0
+        self.rows = 0
+
+    @property
+    def running(self) -> bool:
+        """True while the writer accepts rows (False once stop() has begun)"""
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything already submitted, then stop"""
+        if not self.running:
+            return
+        # refuse new rows before queueing the sentinel, so none can land behind it
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, txn: Transaction):
+        """Queue one transaction and wait until its group is committed; returns the stored row"""
+        if not self.running:
+            raise RuntimeError("TransactionWriter is not running (write the row directly)")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((txn, future))
+        return await future
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            group: List[Tuple[Transaction, asyncio.Future]] = [item]
+            # everything that arrived while the last commit was running joins this one
+            while len(group) < self.max_group_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+            await self._write_group(group)
+        # anything queued behind the sentinel is still written, never left waiting
+        leftovers = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftovers.append(item)
+        for start in range(0, len(leftovers), self.max_group_size):
+            await self._write_group(leftovers[start:start + self.max_group_size])
+
+    async def _write_group(self, group: List[Tuple[Transaction, asyncio.Future]]) -> None:
+        try:
+            async with self.session_factory() as db:
+                rows = await db.run_sync(transaction_crud.create_transactions, [txn for txn, _ in group])
+        except Exception as e:
+            if len(group) > 1:
+                # retry one by one so a single bad row only fails its own request
+                for entry in group:
+                    await self._write_group([entry])
+                return
+            _, future = group[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.rows += len(rows)
+        for (_, future), row in zip(group, rows):
+            if not future.done():
+                future.set_result(row)
+
+
+# shared instance, started by app.main when DB_STORAGE_MODE=concurrent
+transaction_writer = TransactionWriter()
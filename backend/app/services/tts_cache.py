@@ -0,0 +1,182 @@
+"""
+On-disk cache of per-sentence voiceover clips.
+
+Answers repeat a lot of sentences (disclaimers, templated insight lines,
+the outro), so voiceovers are synthesised one sentence at a time and each
+clip is kept under TTS_CACHE_DIR, keyed on a hash of the sentence, voice id
+and model. Only misses are sent to ElevenLabs; concurrent requests for the
+same sentence are single-flighted. Least recently used clips are dropped
+when the cache grows past TTS_CACHE_MAX_BYTES, except those used in the
+last EVICT_MIN_AGE_SEC, which a job may be about to join.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", "../htn-investEd/backend/tts_cache"))
+MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(1024 ** 3)))
+# clips looked up more recently than this are never evicted
+EVICT_MIN_AGE_SEC = float(os.getenv("TTS_CACHE_EVICT_MIN_AGE_SEC", "600"))
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_WHITESPACE = re.compile(r"\s+")
+
+stats: Dict[str, int] = {
+    "hits": 0, "misses": 0, "coalesced": 0, "failures": 0, "evictions": 0,
+    "chars_synthesized": 0, "chars_saved": 0,
+}
+
+_lock = threading.Lock()
+_flights: Dict[str, threading.Event] = {}
+# bytes on disk, counted on first use
+_total_bytes: Optional[int] = None
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences with whitespace collapsed (same boundaries as the scene chunking)"""
+    sentences = (_WHITESPACE.sub(" ", s).strip() for s in _SENTENCE_END.split(text))
+    return [s for s in sentences if s]
+
+
+def clip_key(sentence: str, voice_id: Optional[str], model_id: str) -> str:
+    payload = json.dumps([sentence, voice_id or "", model_id], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _clip_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.mp3"
+
+
+def _lookup(key: str) -> Optional[str]:
+    path = _clip_path(key)
+    try:
+        # last use drives LRU eviction
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return str(path)
+
+
+def get_or_synthesize(sentence: str, voice_id: Optional[str], model_id: str,
+                      synthesize: Callable[[], str]) -> Optional[str]:
+    """
+    Path of the cached clip for sentence; on a miss synthesize() is called
+    (once, even if several threads ask) and must return the path of a new
+    mp3, or "" on failure. Returns None when synthesis failed.
+    """
+    key = clip_key(sentence, voice_id, model_id)
+    while True:
+        cached = _lookup(key)
+        if cached is not None:
+            with _lock:
+                stats["hits"] += 1
+                stats["chars_saved"] += len(sentence)
+            return cached
+        with _lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            # a leader may have stored the clip and left since our lookup
+            if leader and _clip_path(key).exists():
+                stats["hits"] += 1
+                stats["chars_saved"] += len(sentence)
+                return str(_clip_path(key))
+            if leader:
+                flight = _flights[key] = threading.Event()
+                stats["misses"] += 1
+        if leader:
+            break
+        flight.wait()
+        if _clip_path(key).exists():
+            with _lock:
+                # counted only when the leader's clip was actually reused
+                stats["coalesced"] += 1
+                stats["chars_saved"] += len(sentence)
+            return str(_clip_path(key))
+        # the leader failed; try ourselves
+    try:
+        produced = synthesize()
+        if not produced:
+            with _lock:
+                stats["failures"] += 1
+            return None
+        path = _clip_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # rename is atomic, so readers never see half a clip
+            os.replace(produced, path)
+        except OSError:
+            # different filesystem
+            shutil.move(produced, path)
+        _account(path.stat().st_size)
+        with _lock:
+            stats["chars_synthesized"] += len(sentence)
+        return str(path)
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+        flight.set()
+
+
+def _clips() -> List[Path]:
+    return list(CACHE_DIR.glob("*/*.mp3")) if CACHE_DIR.exists() else []
+
+
+def _account(added: int) -> None:
+    global _total_bytes
+    with _lock:
+        if _total_bytes is None:
+            _total_bytes = sum(path.stat().st_size for path in _clips())
+        else:
+            _total_bytes += added
+        over = _total_bytes > MAX_BYTES
+    if over:
+        evict()
+
+
+def evict() -> int:
+    """
+    Drop least recently used clips until the cache is under MAX_BYTES,
+    sparing clips used in the last EVICT_MIN_AGE_SEC
+    """
+    global _total_bytes
+    recent = time.time() - EVICT_MIN_AGE_SEC
+    entries = []
+    for path in _clips():
+        try:
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= MAX_BYTES or mtime > recent:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    with _lock:
+        _total_bytes = total
+        stats["evictions"] += removed
+    return removed
+
+
+def get_stats() -> dict:
+    with _lock:
+        # a coalesced lookup reused another request's fresh clip: it paid nothing either
+        served = stats["hits"] + stats["coalesced"]
+        lookups = served + stats["misses"]
+        characters = stats["chars_synthesized"] + stats["chars_saved"]
+        return {
+            **stats,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+            "chars_saved_rate": round(stats["chars_saved"] / characters, 3) if characters else 0.0,
+            "bytes": _total_bytes,
+            "max_bytes": MAX_BYTES,
+        }
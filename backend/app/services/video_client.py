@@ -0,0 +1,119 @@
+"""
+Shared async HTTP client for the ai-video backend (VIDEO_API_URL).
+
+Everything that talks to the video service goes through this module so all
+calls share one keep-alive connection pool instead of opening a new TCP
+connection per request. Each call has its own timeout. At most
+MAX_CONCURRENT_REQUESTS are in flight at once. 5xx responses and connection
+errors are retried with jittered exponential backoff. Requests that are not
+idempotent (POST /videos creates a billed job) are only retried when they
+never reached the server.
+"""
+import asyncio
+import os
+import random
+from typing import Optional
+
+import httpx
+
+VIDEO_API = os.getenv("VIDEO_API_URL", "http://localhost:8000")  # AI-video backend
+
+MAX_CONNECTIONS = int(os.getenv("VIDEO_API_MAX_CONNECTIONS", "50"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("VIDEO_API_MAX_CONCURRENCY", "50"))
+
+# seconds; connect is kept short so a dead backend fails fast
+CONNECT_TIMEOUT_SEC = 5.0
+REQUEST_TIMEOUT_SEC = 30.0
+STATUS_TIMEOUT_SEC = 10.0
+
+MAX_RETRIES = 3
+BACKOFF_BASE_SEC = 0.5
+BACKOFF_MAX_SEC = 8.0
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# the request was never sent, so retrying cannot duplicate it
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class VideoAPIError(Exception):
+    """The video service answered with an error, or could not be reached after retries"""
+
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _http() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=VIDEO_API,
+            timeout=httpx.Timeout(REQUEST_TIMEOUT_SEC, connect=CONNECT_TIMEOUT_SEC),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return _client
+
+
+def _limit() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _semaphore
+
+
+async def close() -> None:
+    """Close the pooled connections (app shutdown)"""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _semaphore = None
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max, base * 2**attempt)]"""
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** attempt))
+
+
+async def _request(method: str, path: str, timeout: float, **kwargs) -> httpx.Response:
+    """
+    Send one request, retrying up to MAX_RETRIES times: idempotent methods on
+    5xx and any transport error, others only when the connection failed
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with _limit():
+                res = await _http().request(
+                    method, path, timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT_SEC), **kwargs
+                )
+        except httpx.TransportError as e:
+            retryable = idempotent or isinstance(e, _NOT_SENT_ERRORS)
+            if attempt == MAX_RETRIES or not retryable:
+                raise VideoAPIError(f"{method} {path} failed: {e!r}") from e
+        else:
+            if res.status_code < 500 or attempt == MAX_RETRIES or not idempotent:
+                return res
+        # back off outside the semaphore so waiting retries do not hold a slot
+        await asyncio.sleep(_backoff(attempt))
+
+
+async def request_video(prompt: str, callback_url: Optional[str] = None,
+                        style: str = "friendly", duration_sec: int = 18) -> str:
+    """Start a video job and return its id"""
+    payload = {"prompt": prompt, "style": style, "duration_sec": duration_sec}
+    if callback_url:
+        payload["callback_url"] = callback_url
+    res = await _request("POST", "/videos", REQUEST_TIMEOUT_SEC, json=payload)
+    if res.status_code != 200:
+        raise VideoAPIError(f"Failed to request video: {res.text}")
+    return res.json()["id"]
+
+
+async def get_video_status(video_job_id: str) -> dict:
+    """Current state of a video job ({"status", "url", "error", ...})"""
+    res = await _request("GET", f"/videos/{video_job_id}", STATUS_TIMEOUT_SEC)
+    if res.status_code != 200:
+        raise VideoAPIError(f"Failed to fetch video status: {res.text}")
+    return res.json()
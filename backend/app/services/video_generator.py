@@ -1,24 +1,113 @@
 import os
+import shutil
+import time
 import uuid
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from manim import *
 import elevenlabs
 from dotenv import load_dotenv
+from app.services import artefacts, compositor, render_cache, render_pool, scene_layout, scene_segments, tts_cache
 
 # Load environment variables
 load_dotenv()
 
-def merge_video_with_audio(video_path: str, audio_path: str, job_id: str, status_callback=None) -> str:
+# Bump whenever the generated FinancialHelpScene (or its shared intro/outro
+# segments) changes, so cached renders of the old template are no longer served
+SCENE_TEMPLATE_VERSION = "2"
+
+# Manim quality: l = 480p15 (fast), m = 720p30, h = 1080p60
+RENDER_QUALITY = "l"
+
+# "timed" narrates each sentence-aligned chunk first (chunks in parallel) and
+# keeps its cards up for as long as its narration, so nothing is cut off or rendered only
+# to be thrown away; "parallel" starts one voiceover together with the render
+# (job latency is max(render, tts) + mux) and trims to the shorter stream;
+# "progressive" also lets the mux start on the voiceover while it is still
+# being written; "sequential" runs render, tts, mux in order
+VIDEO_PIPELINE_MODE = os.getenv("VIDEO_PIPELINE_MODE", "timed")
+
+# Tiered jobs first publish a silent compositor draft at DRAFT_QUALITY, then
+# re-render at TIERED_FINAL_QUALITY in the batch lane
+DRAFT_QUALITY = "d"
+TIERED_FINAL_QUALITY = os.getenv("TIERED_FINAL_QUALITY", "m")
+# interactive questions get a draft video first, then the full-quality render
+VIDEO_QUALITY_TIERS = os.getenv("VIDEO_QUALITY_TIERS", "1") == "1"
+
+# "manim" renders scenes on the worker pool; "compositor" blends pre-rasterised
+# text cards with NumPy and pipes them to ffmpeg (much faster, same layout)
+VIDEO_RENDER_ENGINE = os.getenv("VIDEO_RENDER_ENGINE", "manim")
+RENDER_ENGINES = ("manim", "compositor")
+
+# "hls" also segments the final video into videos/{job_id}/hls/index.m3u8
+VIDEO_DELIVERY_FORMAT = os.getenv("VIDEO_DELIVERY_FORMAT", "mp4")
+HLS_SEGMENT_SEC = int(os.getenv("HLS_SEGMENT_SEC", "4"))
+
+# voiceover calls are network waits, so a few threads serve many jobs
+_tts_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TTS_WORKERS", "8")), thread_name_prefix="tts")
+
+# Voiceovers are synthesised per sentence and each clip is cached
+# (app/services/tts_cache.py); progressive streaming still uses one call.
+# Sentence calls get their own threads: voiceovers on _tts_executor wait on them.
+TTS_SENTENCE_CACHE = os.getenv("TTS_SENTENCE_CACHE", "1") == "1"
+TTS_MODEL_ID = "eleven_monolingual_v1"
+_tts_sentence_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TTS_WORKERS", "8")),
+                                            thread_name_prefix="tts-sentence")
+
+class RenderCancelled(Exception):
+    """Raised at a stage boundary when the job's cancel event is set"""
+
+# bytes per read when following a voiceover that is still being written
+FOLLOW_BLOCK_SIZE = 64 * 1024
+
+class VoiceoverStream:
+    """
+    Progress of a voiceover being written, shared between the TTS thread and a
+    progressive mux that reads part_path while it grows.
+    """
+    def __init__(self, part_path: Path):
+        self.part_path = part_path
+        self.started = threading.Event()   # part_path exists and is being written
+        self.finished = threading.Event()  # writer stopped (successfully or not)
+        self.ok = False
+
+    def wait_started(self) -> bool:
+        """Block until writing starts; False if the voiceover failed before that"""
+        while not self.started.wait(0.05):
+            if self.finished.is_set():
+                return False
+        return True
+
+    def follow(self):
+        """Yield the file's bytes as they are written, until the writer finishes"""
+        with open(self.part_path, "rb") as f:
+            while True:
+                block = f.read(FOLLOW_BLOCK_SIZE)
+                if block:
+                    yield block
+                elif self.finished.is_set():
+                    # drain whatever was written after the last empty read
+                    block = f.read()
+                    if block:
+                        yield block
+                    return
+                else:
+                    time.sleep(0.02)
+
+def merge_video_with_audio(video_path: str, audio_path: str, job_id: str, status_callback=None,
+                           audio_stream: VoiceoverStream = None) -> str:
     """
     Merge video with audio using ffmpeg.
     
     Args:
         video_path: Path to the video file
-        audio_path: Path to the audio file
+        audio_path: Path to the audio file (ignored when audio_stream is given)
         job_id: Unique identifier for the job
         status_callback: Optional callback function to update job status
+        audio_stream: Voiceover still being written; its bytes are piped into
+            ffmpeg as they arrive so the mux does not wait for the whole file
     
     Returns:
         Path to the merged video file
@@ -31,33 +120,43 @@ def merge_video_with_audio(video_path: str, audio_path: str, job_id: str, status
     try:
         # Create paths
         video_file = Path(video_path)
-        audio_file = Path(audio_path)
-        job_dir = Path(f"../htn-investEd/backend/videos/{job_id}")
+        audio_file = Path(audio_path) if audio_path else None
+        job_dir = artefacts.job_dir(job_id)
         merged_video_path = job_dir / "final_video.mp4"
         
         if not video_file.exists():
             raise Exception(f"Video file not found: {video_path}")
-        if not audio_file.exists():
+        if audio_stream is not None:
+            if not audio_stream.wait_started():
+                raise Exception("Voiceover generation failed")
+        elif not audio_file.exists():
             raise Exception(f"Audio file not found: {audio_path}")
         
         update_status("processing", 96, "Starting video and audio merging...")
         
         # ffmpeg command to merge video and audio
+        audio_input = ["-f", "mp3", "-i", "pipe:0"] if audio_stream is not None else ["-i", str(audio_file)]
         cmd = [
             "ffmpeg",
             "-i", str(video_file),     # Input video
-            "-i", str(audio_file),     # Input audio
+            *audio_input,              # Input audio (file, or stdin for a streaming voiceover)
             "-c:v", "copy",            # Copy video codec (no re-encoding)
             "-c:a", "aac",             # Use AAC audio codec
             "-map", "0:v:0",           # Map first video stream
             "-map", "1:a:0",           # Map first audio stream
             "-shortest",               # End when shortest stream ends
+            "-movflags", "+faststart", # moov atom first: playback starts before the whole file arrives
             "-y",                      # Overwrite output file
             str(merged_video_path)
         ]
         
         # Run ffmpeg
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        if audio_stream is not None:
+            result = _run_ffmpeg_with_stream(cmd, audio_stream)
+            if not audio_stream.ok:
+                raise Exception("Voiceover generation failed while merging")
+        else:
+            result = subprocess.run(cmd, capture_output=True, text=True)
         
         if result.returncode != 0:
             raise Exception(f"FFmpeg failed: {result.stderr}")
@@ -69,21 +168,66 @@ def merge_video_with_audio(video_path: str, audio_path: str, job_id: str, status
         return str(merged_video_path)
         
     except Exception as e:
-        update_status("failed", 0, f"Video merging failed: {str(e)}")
+        # callers fall back to the silent video; only they decide whether the job failed
         raise Exception(f"Video merging failed: {str(e)}")
 
-def generate_voiceover(text_content: str, job_id: str) -> str:
+def _run_ffmpeg_with_stream(cmd: list, audio_stream: VoiceoverStream) -> subprocess.CompletedProcess:
+    """Run ffmpeg, feeding stdin from a voiceover that is still being written"""
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # drain stderr concurrently so a chatty ffmpeg cannot block on a full pipe
+    stderr_chunks = []
+    reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    reader.start()
+    try:
+        for block in audio_stream.follow():
+            process.stdin.write(block)
+    except BrokenPipeError:
+        pass
+    finally:
+        process.stdin.close()
+    returncode = process.wait()
+    reader.join()
+    stderr = b"".join(stderr_chunks).decode(errors="replace")
+    return subprocess.CompletedProcess(cmd, returncode, "", stderr)
+
+def generate_voiceover(text_content: str, job_id: str, stats: dict = None,
+                       stream: VoiceoverStream = None, file_name: str = "voiceover.mp3",
+                       stop: threading.Event = None) -> str:
     """
     Generate voiceover using ElevenLabs API.
     
+    Audio chunks are written to voiceover.mp3.part as they arrive and the file
+    is renamed to voiceover.mp3 once complete, so memory stays flat and a
+    half-written file is never mistaken for a finished one.
+    
     Args:
         text_content: The text to convert to speech
         job_id: Unique identifier for the job
+        stats: Optional dict that receives tts_bytes, tts_chunks and
+            tts_first_chunk_ms
+        stream: Optional VoiceoverStream for a progressive mux that reads the
+            .part file while it is written
+        file_name: Output file name in the job directory
+        stop: When set (the render failed or the job was cancelled), the
+            ElevenLabs stream is abandoned and no further sentences are sent
     
     Returns:
-        Path to the generated audio file
+        Path to the generated audio file ("" if it failed or was stopped)
     """
     try:
+        if stream is None and TTS_SENTENCE_CACHE:
+            return _generate_cached_voiceover(text_content, job_id, stats, file_name, stop)
+        return _generate_voiceover(text_content, job_id, stats, stream, file_name, stop)
+    finally:
+        if stream is not None:
+            stream.finished.set()
+
+def _generate_voiceover(text_content: str, job_id: str, stats: dict, stream: VoiceoverStream,
+                        file_name: str = "voiceover.mp3", stop: threading.Event = None) -> str:
+    try:
+        if stop is not None and stop.is_set():
+            return ""
+        
         # Reload environment variables to ensure they're available
         load_dotenv()
         
@@ -96,51 +240,70 @@ def generate_voiceover(text_content: str, job_id: str) -> str:
             return ""
         
         # Create job directory if it doesn't exist
-        job_dir = Path(f"../htn-investEd/backend/videos/{job_id}")
+        job_dir = artefacts.job_dir(job_id)
         job_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize ElevenLabs client
         client = elevenlabs.ElevenLabs(api_key=api_key)
         
         # Save the audio file
-        audio_file_path = job_dir / "voiceover.mp3"
+        audio_file_path = job_dir / file_name
+        part_file_path = stream.part_path if stream is not None else job_dir / f"{file_name}.part"
         
         # Generate and save audio using ElevenLabs with proper error handling
         try:
             print(f"[DEBUG] Calling ElevenLabs text_to_speech for {len(text_content)} characters")
+            started = time.perf_counter()
             
             # The convert method returns a generator - errors happen during iteration
             audio_generator = client.text_to_speech.convert(
                 voice_id=voice_id,
                 text=text_content,
-                model_id="eleven_monolingual_v1"
+                model_id=TTS_MODEL_ID
             )
             
-            print(f"[DEBUG] Got audio generator, starting to consume chunks...")
-            
-            # Collect audio data with error handling during iteration
-            audio_data = b""
+            # Stream chunks straight to disk with error handling during iteration
+            total_bytes = 0
             chunk_count = 0
+            first_chunk_ms = None
             
-            for chunk in audio_generator:
-                chunk_count += 1
-                if chunk:
-                    audio_data += chunk
-                    print(f"[DEBUG] Chunk {chunk_count}: {len(chunk)} bytes")
-                else:
-                    print(f"[DEBUG] Empty chunk {chunk_count}")
+            with open(part_file_path, "wb") as f:
+                if stream is not None:
+                    stream.started.set()
+                for chunk in audio_generator:
+                    if stop is not None and stop.is_set():
+                        # closing the stream stops ElevenLabs generating the rest
+                        audio_generator.close()
+                        raise Exception("voiceover stopped: the render failed or was cancelled")
+                    chunk_count += 1
+                    if not chunk:
+                        continue
+                    if first_chunk_ms is None:
+                        first_chunk_ms = round((time.perf_counter() - started) * 1000)
+                    f.write(chunk)
+                    if stream is not None:
+                        # make the bytes visible to the progressive mux right away
+                        f.flush()
+                    total_bytes += len(chunk)
             
-            print(f"[DEBUG] Collected {len(audio_data)} bytes from {chunk_count} chunks")
+            if stats is not None:
+                stats.update({"tts_bytes": total_bytes, "tts_chunks": chunk_count,
+                              "tts_first_chunk_ms": first_chunk_ms})
+            print(f"[DEBUG] Streamed {total_bytes} bytes from {chunk_count} chunks "
+                  f"(first chunk after {first_chunk_ms} ms)")
             
-            if len(audio_data) == 0:
+            if total_bytes == 0:
                 print("No audio data collected from ElevenLabs")
+                part_file_path.unlink(missing_ok=True)
                 return ""
             
-            # Write to file
-            with open(audio_file_path, "wb") as f:
-                f.write(audio_data)
+            # Atomic rename: readers see either no voiceover or the complete file
+            os.replace(part_file_path, audio_file_path)
+            if stream is not None:
+                stream.ok = True
                 
         except Exception as api_error:
+            part_file_path.unlink(missing_ok=True)
             # Handle different types of API errors
             error_str = str(api_error)
             print(f"[DEBUG] ElevenLabs API error during generation: {error_str}")
@@ -170,6 +333,80 @@ def generate_voiceover(text_content: str, job_id: str) -> str:
         print(f"Error generating voiceover: {str(e)}")
         return ""
 
+def _generate_cached_voiceover(text_content: str, job_id: str, stats: dict, file_name: str,
+                               stop: threading.Event = None) -> str:
+    """
+    Voiceover assembled from per-sentence clips: cached sentences are reused,
+    only misses are synthesised (in parallel), and the clips are joined into
+    file_name in the job directory. Returns "" if any sentence fails.
+    """
+    sentences = tts_cache.split_sentences(text_content)
+    if not sentences:
+        return ""
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID")
+    synthesized = []
+    
+    def clip_for(sentence: str):
+        if stop is not None and stop.is_set():
+            return None
+        def synthesize():
+            synthesized.append(sentence)
+            # written to a scratch file in the job dir, then moved into the cache
+            return _generate_voiceover(sentence, job_id, None, None, f".tts-{uuid.uuid4().hex}.mp3", stop)
+        return tts_cache.get_or_synthesize(sentence, voice_id, TTS_MODEL_ID, synthesize)
+    
+    job_dir = artefacts.job_dir(job_id)
+    audio_file_path = job_dir / file_name
+    for attempt in range(2):
+        clips = list(_tts_sentence_executor.map(clip_for, sentences))
+        if not all(clips):
+            return ""
+        try:
+            join_audio_clips(clips, str(audio_file_path))
+            break
+        except Exception as e:
+            print(f"[{job_id}] Joining voiceover clips failed: {e}")
+            # a clip evicted since its lookup is resynthesised on the retry
+            if attempt or all(Path(clip).exists() for clip in clips):
+                return ""
+    if stats is not None:
+        stats.update({"tts_sentences": len(sentences),
+                      "tts_sentences_synthesized": len(synthesized),
+                      "tts_bytes": audio_file_path.stat().st_size})
+    return str(audio_file_path)
+
+def join_audio_clips(clip_paths: list, output_path: str) -> str:
+    """
+    Join mp3 clips back to back. Decoding honours each clip's encoder
+    delay/padding, so re-encoding the concatenation leaves no gaps at the
+    sentence boundaries. Written next to output_path and renamed into place.
+    """
+    output = Path(output_path)
+    part_path = output.with_name(f"{output.name}.part")
+    if len(clip_paths) == 1:
+        shutil.copyfile(clip_paths[0], part_path)
+    else:
+        inputs = []
+        for clip_path in clip_paths:
+            inputs += ["-i", str(clip_path)]
+        labels = "".join(f"[{index}:a]" for index in range(len(clip_paths)))
+        cmd = [
+            "ffmpeg",
+            *inputs,
+            "-filter_complex", f"{labels}concat=n={len(clip_paths)}:v=0:a=1[audio]",
+            "-map", "[audio]",
+            "-c:a", "libmp3lame",
+            "-f", "mp3",
+            "-y", str(part_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            part_path.unlink(missing_ok=True)
+            raise Exception(f"FFmpeg audio join failed: {result.stderr}")
+    # Atomic rename: readers see either no voiceover or the complete file
+    os.replace(part_path, output)
+    return str(output)
+
 # Old scene class removed - using the improved version in generate_financial_help_video function
 
 def get_audio_duration(audio_path: str) -> float:
@@ -192,243 +429,401 @@ def get_audio_duration(audio_path: str) -> float:
         print(f"Error getting audio duration: {e}")
         return 15.0  # Default fallback duration
 
-def generate_financial_help_video(text_content: str, job_id: str, status_callback=None) -> str:
+# MPEG audio Layer III frame header tables
+_MP3_BITRATES_KBPS = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# version bits -> sample rates (MPEG-1, MPEG-2, MPEG-2.5)
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def mp3_duration(audio_path: str) -> float:
+    """
+    Duration of an MP3 from its own frame headers (samples per frame / sample
+    rate, summed over frames): exact for CBR and VBR, and no ffprobe process.
+    Returns 0.0 when no frames are found.
+    """
+    data = Path(audio_path).read_bytes()
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # skip the ID3v2 tag (syncsafe size)
+        pos = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    seconds = 0.0
+    while pos + 4 <= len(data):
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version_bits, layer_bits = (b1 >> 3) & 3, (b1 >> 1) & 3
+        bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+        if (data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or version_bits == 1 or layer_bits != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            # not a Layer III frame header: resync
+            pos += 1
+            continue
+        mpeg1 = version_bits == 3
+        bitrate = _MP3_BITRATES_KBPS["mpeg1" if mpeg1 else "mpeg2"][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+        frame_samples = 1152 if mpeg1 else 576
+        seconds += frame_samples / sample_rate
+        pos += (frame_samples // 8) * bitrate // sample_rate + ((b2 >> 1) & 1)
+    return seconds
+
+def audio_duration(audio_path: str) -> float:
+    """Duration from the MP3 frame headers, falling back to ffprobe"""
+    try:
+        seconds = mp3_duration(audio_path)
+        if seconds > 0:
+            return seconds
+    except OSError as e:
+        print(f"Could not read {audio_path}: {e}")
+    return get_audio_duration(audio_path)
+
+def narrate_chunks(chunks: list, job_id: str) -> list:
+    """
+    One voiceover clip per sentence-aligned text chunk, generated in
+    parallel on the TTS threads, so no sentence is cut at a card boundary.
+    Returns the clip paths in chunk order, or [] if any clip failed (the
+    video is then rendered silent with default timings).
+    """
+    futures = [
+        _tts_executor.submit(generate_voiceover, chunk, job_id, None, None, f"narration_{index:03d}.mp3")
+        for index, chunk in enumerate(chunks)
+    ]
+    clips = [future.result() for future in futures]
+    return clips if clips and all(clips) else []
+
+def merge_video_with_narration(video_path: str, clip_paths: list, offsets: list, job_id: str) -> tuple:
+    """
+    Place each narration clip at its card's start time and mux the result
+    with the video in one ffmpeg run. The video is already as long as the
+    narration, so nothing is trimmed except trailing silence. Also writes the
+    combined narration as voiceover.mp3. Returns (merged video, voiceover).
+    """
+    job_dir = artefacts.job_dir(job_id)
+    merged_video_path = job_dir / "final_video.mp4"
+    voiceover_path = job_dir / "voiceover.mp3"
+    
+    inputs = ["-i", str(video_path)]
+    delayed = []
+    for index, (clip_path, offset) in enumerate(zip(clip_paths, offsets)):
+        inputs += ["-i", str(clip_path)]
+        delay_ms = round(offset * 1000)
+        delayed.append(f"[{index + 1}:a]adelay={delay_ms}|{delay_ms}[n{index}]")
+    labels = "".join(f"[n{index}]" for index in range(len(clip_paths)))
+    filter_graph = ";".join(delayed + [
+        f"{labels}amix=inputs={len(clip_paths)}:normalize=0,asplit=2[narration][voiceover]",
+        # pad with silence to the end of the video (outro)
+        "[narration]apad[audio]",
+    ])
+    cmd = [
+        "ffmpeg",
+        *inputs,
+        "-filter_complex", filter_graph,
+        "-map", "0:v:0", "-map", "[audio]",
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-shortest",
+        "-movflags", "+faststart",
+        "-y", str(merged_video_path),
+        "-map", "[voiceover]",
+        "-c:a", "libmp3lame",
+        "-y", str(voiceover_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"FFmpeg narration merge failed: {result.stderr}")
+    if not merged_video_path.exists():
+        raise Exception("Merged video file was not created")
+    return str(merged_video_path), str(voiceover_path)
+
+def segment_hls(video_path: str, job_id: str) -> str:
+    """Remux the final video (no re-encode) into an HLS VOD playlist; returns the playlist path"""
+    hls_dir = artefacts.job_dir(job_id) / "hls"
+    hls_dir.mkdir(parents=True, exist_ok=True)
+    playlist_path = hls_dir / "index.m3u8"
+    cmd = [
+        "ffmpeg",
+        "-i", str(video_path),
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SEC),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(hls_dir / "segment_%03d.ts"),
+        "-y",
+        str(playlist_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"FFmpeg HLS segmenting failed: {result.stderr}")
+    return str(playlist_path)
+
+def _deliver_hls(timings: dict, video_path: str, job_id: str) -> None:
+    """Optional HLS output; the MP4 stays the primary artefact, so failures are only logged"""
+    if VIDEO_DELIVERY_FORMAT != "hls":
+        return
+    try:
+        playlist_path = _timed(timings, "hls", segment_hls, video_path, job_id)
+        artefacts.record(job_id, "hls", playlist_path)
+    except Exception as e:
+        print(f"[{job_id}] HLS output failed: {e}")
+
+def _template_version(render_engine: str, pipeline_mode: str) -> str:
+    """
+    Render cache version: the two engines draw the same layout slightly
+    differently, and timed videos size each card to its narration
+    """
+    version = SCENE_TEMPLATE_VERSION if render_engine == "manim" else f"{SCENE_TEMPLATE_VERSION}-{render_engine}"
+    return f"{version}-timed" if pipeline_mode == "timed" else version
+
+def prepare_shared_segments() -> None:
+    """
+    Render the intro/outro for the current template now instead of on the
+    first job, at every quality jobs are rendered at by default
+    """
+    qualities = [RENDER_QUALITY]
+    if VIDEO_QUALITY_TIERS and TIERED_FINAL_QUALITY != RENDER_QUALITY:
+        qualities.append(TIERED_FINAL_QUALITY)
+    for quality in qualities:
+        for name in scene_segments.SHARED_SEGMENTS:
+            scene_segments.get_segment(name, SCENE_TEMPLATE_VERSION, quality)
+
+def render_draft(text_content: str, job_id: str) -> str:
+    """Silent low-res, low-fps compositor render for the draft tier; returns its path"""
+    job_dir = artefacts.job_dir(job_id)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    draft_path = compositor.render(text_content, str(job_dir / "draft.mp4"), DRAFT_QUALITY)
+    artefacts.record(job_id, "draft", draft_path)
+    return draft_path
+
+def render_video(text_content: str, job_id: str, media_dir: str, render_engine: str = "manim",
+                 quality: str = RENDER_QUALITY, card_holds: list = None) -> str:
+    """
+    Render the job's FinancialHelpScene.mp4.
+    
+    "manim": render the answer body and stream-copy it between the cached
+    intro and outro, falling back to the whole scene if the shared segments
+    cannot be used. "compositor": blend pre-rasterised text cards and encode
+    them in one ffmpeg pass (app/services/compositor.py).
+    """
+    output_path = str(artefacts.job_dir(job_id) / "FinancialHelpScene.mp4")
+    if render_engine == "compositor":
+        return compositor.render(text_content, output_path, quality, card_holds)
+    try:
+        body_path = render_pool.render_scene("FinancialHelpBody", media_dir, quality, text_content, card_holds)
+        intro_path = scene_segments.get_segment("intro", SCENE_TEMPLATE_VERSION, quality)
+        outro_path = scene_segments.get_segment("outro", SCENE_TEMPLATE_VERSION, quality)
+        return scene_segments.concat([intro_path, body_path, outro_path], output_path)
+    except Exception as e:
+        print(f"[{job_id}] Segmented render failed, rendering the full scene: {e}")
+        return render_pool.render_financial_help(text_content, media_dir, quality, card_holds)
+
+def _stop_voiceover(voiceover_future, stop: threading.Event) -> None:
+    """Drop a voiceover the job no longer needs: unstarted ones never run, running ones stop streaming"""
+    stop.set()
+    if voiceover_future is not None:
+        voiceover_future.cancel()
+
+def _timed(timings: dict, stage: str, fn, *args):
+    """Run fn(*args) and record its wall time as timings[f"{stage}_ms"]"""
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[f"{stage}_ms"] = round((time.perf_counter() - started) * 1000)
+
+def _generate_timed_video(text_content: str, job_id: str, media_dir: str, render_engine: str, quality: str,
+                          cache_key: str, timings: dict, update_status) -> str:
+    """
+    Narrate each sentence-aligned chunk, spread each clip's duration over
+    the chunk's cards (scene_layout.narration_timeline), render, then mux
+    with every clip placed at the start of its chunk's first card. Without narration (e.g. quota exceeded) the
+    video is rendered silent with the default timings.
+    """
+    chunks = scene_layout.chunk_cards(text_content)
+    update_status("processing", 30, f"Generating narration for {len(chunks)} chunks with ElevenLabs...")
+    clips = _timed(timings, "tts", narrate_chunks, [chunk for chunk, _ in chunks], job_id)
+    
+    card_holds = None
+    clip_offsets = None
+    if clips:
+        durations = [audio_duration(clip) for clip in clips]
+        timings["narration_sec"] = round(sum(durations), 2)
+        fps = compositor.RESOLUTIONS[quality][2]
+        card_holds, clip_offsets = scene_layout.narration_timeline(durations, [cards for _, cards in chunks], fps)
+    
+    if render_engine == "compositor":
+        update_status("processing", 40, "Compositing video frames...")
+    else:
+        update_status("processing", 40, "Rendering video on a Manim worker...")
+    video_path = _timed(timings, "render", render_video, text_content, job_id, media_dir,
+                        render_engine, quality, card_holds)
+    
+    if not Path(video_path).exists():
+        raise Exception(f"No video file generated by the {render_engine} engine")
+    
+    artefacts.record(job_id, "video", video_path)
+    update_status("processing", 80, f"Video generated successfully: {video_path}")
+    
+    if not clips:
+        update_status("processing", 90, "Voiceover generation failed (likely quota exceeded), returning video without audio")
+        return video_path
+    
+    update_status("processing", 90, "Merging video with narration...")
+    try:
+        merged_video_path, voiceover_path = _timed(timings, "mux", merge_video_with_narration, video_path,
+                                                   clips, clip_offsets, job_id)
+        artefacts.record(job_id, "voiceover", voiceover_path)
+        artefacts.record(job_id, "final_video", merged_video_path)
+        _deliver_hls(timings, merged_video_path, job_id)
+        try:
+            render_cache.store(cache_key, merged_video_path, [merged_video_path, video_path, voiceover_path])
+        except OSError as cache_error:
+            print(f"[{job_id}] Could not store render in cache: {cache_error}")
+        update_status("processing", 100, f"Final video with narration created: {merged_video_path}")
+        return merged_video_path
+    except RenderCancelled:
+        raise
+    except Exception as e:
+        update_status("processing", 95, f"Merging failed, returning original video: {str(e)}")
+        return video_path
+
+def generate_financial_help_video(text_content: str, job_id: str, status_callback=None,
+                                  pipeline_mode: str = None, cancel_event: threading.Event = None,
+                                  render_engine: str = None, quality: str = None) -> str:
     """
     Generate a Manim video for financial help text content, then merge with audio.
     
     Pipeline:
     1. Generate video from text
-    2. Generate voiceover from same text
-    3. Merge video and audio into final output
+    2. Generate voiceover from same text (in parallel with 1 unless
+       pipeline_mode is "sequential")
+    3. Merge video and audio into final output ("progressive" starts this
+       while the voiceover is still streaming to disk)
+    
+    The "timed" pipeline instead narrates each sentence-aligned chunk first
+    and keeps its cards up for as long as its narration (see
+    _generate_timed_video).
+    
+    Per-stage wall times (render_ms, tts_ms, mux_ms, total_ms) and voiceover
+    counters (tts_bytes, tts_first_chunk_ms) are passed to status_callback
+    as timings.
     
     Args:
         text_content: The financial help text to animate
         job_id: Unique identifier for the job/video
         status_callback: Optional callback function to update job status
+        pipeline_mode: "timed", "parallel", "progressive" or "sequential"
+            (default VIDEO_PIPELINE_MODE)
+        cancel_event: When set, the pipeline raises RenderCancelled at its
+            next status update
+        render_engine: "manim" or "compositor" (default VIDEO_RENDER_ENGINE)
+        quality: Manim quality flag (default RENDER_QUALITY)
     
     Returns:
         Path to the final merged video file
     """
+    started = time.perf_counter()
+    timings = {}
+    pipeline_mode = pipeline_mode or VIDEO_PIPELINE_MODE
+    parallel = pipeline_mode in ("parallel", "progressive")
+    render_engine = render_engine or VIDEO_RENDER_ENGINE
+    quality = quality or RENDER_QUALITY
+    
     def update_status(status, progress, message):
+        if cancel_event is not None and cancel_event.is_set() and status != "failed":
+            raise RenderCancelled(f"Job {job_id} was cancelled")
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000)
         if status_callback:
-            status_callback(job_id, status, progress, message)
+            status_callback(job_id, status, progress, message, timings=dict(timings))
         print(f"[{job_id}] {progress}% - {message}")
     
     # Create job directory
-    job_dir = Path(f"../htn-investEd/backend/videos/{job_id}")
+    job_dir = artefacts.job_dir(job_id)
     job_dir.mkdir(parents=True, exist_ok=True)
     
-    update_status("processing", 20, "Created job directory, preparing scene...")
-    
-    # Create temporary scene file with the original working approach
-    # Properly escape the text content
-    escaped_content = text_content.replace('"', '\\"').replace("'", "\\'")
-    
-    scene_content = f'''from manim import *
-import sys
-import os
-import re
-
-class FinancialHelpScene(Scene):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.text_content = """{escaped_content}"""
-    
-    def chunk_text(self, text, max_chars_per_chunk=150):
-        """Split text into logical chunks based on sentences and length"""
-        # Split by sentences first
-        sentences = re.split(r'(?<=[.!?])' + r'\\s+', text)
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            # If adding this sentence would exceed max length, start new chunk
-            if len(current_chunk + " " + sentence) > max_chars_per_chunk and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
-        
-        # Add the last chunk if it exists
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        return chunks
-    
-    def create_grid_text_chunks(self, text, max_width=35, max_lines_per_chunk=3):
-        """Create multiple text chunks that fit within grid cells with proper line wrapping"""
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        # First, create all lines
-        for word in words:
-            if len(current_line + " " + word) <= max_width:
-                current_line += " " + word if current_line else word
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        
-        if current_line:
-            lines.append(current_line)
-        
-        # Now split lines into chunks of max_lines_per_chunk
-        chunks = []
-        for i in range(0, len(lines), max_lines_per_chunk):
-            chunk_lines = lines[i:i + max_lines_per_chunk]
-            chunks.append(chunk_lines)
-        
-        return chunks
-    
-    def construct(self):
-        # Define the layout grid
-        title_y = 3    # Top area
-        content_y = 0  # Middle area (center)
-        footer_y = -3  # Bottom area
-        
-        # Create persistent title
-        title = Text("Financial Help", font_size=40, color=BLUE, weight=BOLD)
-        title.move_to([0, title_y, 0])
-        
-        # Split content into logical chunks
-        content_chunks = self.chunk_text(self.text_content)
-        
-        # Scene 1: Title Introduction
-        self.play(Write(title), run_time=1.5)
-        self.wait(1)
-        
-        # Process each chunk
-        for chunk_text in content_chunks:
-            # Create multiple sub-chunks from this text
-            text_sub_chunks = self.create_grid_text_chunks(chunk_text, max_width=35, max_lines_per_chunk=3)
-            
-            for sub_chunk_lines in text_sub_chunks:
-                # Create text objects for each line
-                text_objects = []
-                for line in sub_chunk_lines:
-                    if line.strip():  # Only add non-empty lines
-                        text_obj = Text(line.strip(), font_size=24, color=WHITE)
-                        text_objects.append(text_obj)
-                
-                # Skip if no valid text objects
-                if not text_objects:
-                    continue
-                    
-                # Arrange lines vertically in the content area
-                content_group = VGroup(*text_objects)
-                content_group.arrange(DOWN, buff=0.2, center=True)
-                content_group.move_to([0, content_y, 0])
-                
-                # Ensure content fits within bounds
-                if content_group.height > 3.5:
-                    scale_factor = 3.5 / content_group.height
-                    content_group.scale(scale_factor)
-                    content_group.move_to([0, content_y, 0])
-                
-                # Create a subtle background for this content chunk
-                bg_rect = RoundedRectangle(
-                    width=content_group.width + 1,
-                    height=content_group.height + 0.8,
-                    corner_radius=0.2,
-                    color=DARK_GRAY,
-                    fill_opacity=0.1,
-                    stroke_opacity=0.3
-                )
-                bg_rect.move_to(content_group.get_center())
-                
-                # Add objects to scene and animate
-                self.add(bg_rect, content_group)
-                self.play(
-                    FadeIn(bg_rect),
-                    FadeIn(content_group),
-                    run_time=1.5
-                )
-                
-                self.wait(3)  # Display time for each chunk
-                
-                # Remove objects from scene before next chunk
-                self.play(
-                    FadeOut(bg_rect),
-                    FadeOut(content_group),
-                    run_time=0.8
-                )
-                self.remove(bg_rect, content_group)
-        
-        # Final scene: Summary
-        summary_text = Text(
-            "Need more help? Ask another question!",
-            font_size=24,
-            color=YELLOW,
-            slant=ITALIC
-        )
-        summary_text.move_to([0, footer_y, 0])
-        
-        self.play(FadeIn(summary_text), run_time=1.5)
-        self.wait(2)
-        
-        # Final fade out
-        self.play(
-            FadeOut(title),
-            FadeOut(summary_text),
-            run_time=1.5
-        )
-        self.wait(0.5)
-'''
-    
-    # Write scene file
-    scene_file = job_dir / "financial_help_scene.py"
-    with open(scene_file, 'w') as f:
-        f.write(scene_content)
+    # Identical answers render identical videos: serve them from the cache
+    cache_key = render_cache.cache_key(
+        text_content, _template_version(render_engine, pipeline_mode), quality, os.getenv("ELEVENLABS_VOICE_ID")
+    )
+    cached_path = render_cache.fetch(cache_key, job_dir)
+    if cached_path:
+        for kind, file_name in (("video", "FinancialHelpScene.mp4"), ("voiceover", "voiceover.mp3")):
+            if (job_dir / file_name).exists():
+                artefacts.record(job_id, kind, str(job_dir / file_name))
+        artefacts.record(job_id, "final_video", cached_path)
+        _deliver_hls(timings, cached_path, job_id)
+        update_status("processing", 100, f"Final video served from render cache: {cached_path}")
+        return cached_path
     
-    update_status("processing", 30, "Scene file created, setting up Manim environment...")
+    update_status("processing", 20, "Created job directory, preparing scene...")
     
     # Configure Manim output directory
     media_dir = job_dir / "media"
     media_dir.mkdir(exist_ok=True)
     
+    # set when the job gives up, so a voiceover running alongside the render stops paying for characters
+    voiceover_stop = threading.Event()
+    voiceover_future = None
     try:
-        update_status("processing", 40, "Running Manim to generate video...")
-        
-        # Run Manim to generate video
-        cmd = [
-            "manim",
-            "-pql",  # preview, quality low for faster rendering
-            str(scene_file),
-            "FinancialHelpScene",
-            "--media_dir", str(media_dir)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(job_dir))
-        
-        if result.returncode != 0:
-            update_status("failed", 0, f"Manim failed: {result.stderr}")
-            raise Exception(f"Manim failed: {result.stderr}")
+        if pipeline_mode == "timed":
+            return _generate_timed_video(text_content, job_id, str(media_dir), render_engine, quality,
+                                         cache_key, timings, update_status)
+        
+        # The voiceover is pure network wait: start it now so it overlaps the render
+        audio_stream = VoiceoverStream(job_dir / "voiceover.mp3.part") if pipeline_mode == "progressive" else None
+        if parallel:
+            voiceover_future = _tts_executor.submit(_timed, timings, "tts", generate_voiceover,
+                                                    text_content, job_id, timings, audio_stream,
+                                                    "voiceover.mp3", voiceover_stop)
+        
+        if render_engine == "compositor":
+            update_status("processing", 40, "Compositing video frames...")
+        else:
+            update_status("processing", 40, "Rendering video on a Manim worker...")
         
-        update_status("processing", 70, "Video rendering completed, searching for output files...")
+        # Manim renders only the answer on a warm worker (intro/outro are shared segments)
+        video_path = _timed(timings, "render", render_video, text_content, job_id, str(media_dir),
+                            render_engine, quality)
         
-        # Find the generated video file
-        video_files = list(media_dir.glob("**/*.mp4"))
-        if not video_files:
-            update_status("failed", 0, "No video file generated by Manim")
-            raise Exception("No video file generated")
+        if not Path(video_path).exists():
+            raise Exception(f"No video file generated by the {render_engine} engine")
         
-        video_path = str(video_files[0])
+        artefacts.record(job_id, "video", video_path)
         update_status("processing", 80, f"Video generated successfully: {video_path}")
         
-        # Generate voiceover with the same text
-        update_status("processing", 85, "Starting voiceover generation with ElevenLabs...")
-        print(f"[DEBUG] Text content for voiceover: {text_content[:100]}...")
-        print(f"[DEBUG] Text content length: {len(text_content)}")
-        voiceover_path = generate_voiceover(text_content, job_id)
+        # Voiceover still streaming: mux from the growing file instead of waiting for it
+        merged_video_path = None
+        if audio_stream is not None and not voiceover_future.done():
+            update_status("processing", 85, "Merging while the voiceover is still being generated...")
+            try:
+                merged_video_path = _timed(timings, "mux", merge_video_with_audio,
+                                           video_path, None, job_id, status_callback, audio_stream)
+            except Exception as e:
+                update_status("processing", 85, f"Progressive merge failed, merging the finished voiceover instead: {str(e)}")
+        
+        # Generate voiceover with the same text (or wait for the one already running)
+        if voiceover_future is not None:
+            update_status("processing", 85, "Waiting for voiceover generation with ElevenLabs...")
+            voiceover_path = voiceover_future.result()
+        else:
+            update_status("processing", 85, "Starting voiceover generation with ElevenLabs...")
+            voiceover_path = _timed(timings, "tts", generate_voiceover, text_content, job_id, timings)
         print(f"[DEBUG] Voiceover result: {voiceover_path}")
         
         if voiceover_path:
+            artefacts.record(job_id, "voiceover", voiceover_path)
             update_status("processing", 90, f"Voiceover generated successfully: {voiceover_path}")
             
             # Merge video with voiceover
             try:
-                merged_video_path = merge_video_with_audio(video_path, voiceover_path, job_id, status_callback)
+                if merged_video_path is None:
+                    merged_video_path = _timed(timings, "mux", merge_video_with_audio,
+                                               video_path, voiceover_path, job_id, status_callback)
+                artefacts.record(job_id, "final_video", merged_video_path)
+                _deliver_hls(timings, merged_video_path, job_id)
+                # only complete renders are cached; a silent fallback should be retried next time
+                try:
+                    render_cache.store(cache_key, merged_video_path, [merged_video_path, video_path, voiceover_path])
+                except OSError as cache_error:
+                    print(f"[{job_id}] Could not store render in cache: {cache_error}")
                 update_status("processing", 100, f"Final video with audio created: {merged_video_path}")
                 return merged_video_path  # Return the merged video
             except Exception as e:
@@ -438,11 +833,11 @@ class FinancialHelpScene(Scene):
             update_status("processing", 90, "Voiceover generation failed (likely quota exceeded), returning video without audio")
             return video_path
         
+    except RenderCancelled:
+        _stop_voiceover(voiceover_future, voiceover_stop)
+        raise
     except Exception as e:
-        update_status("failed", 0, f"Video generation failed: {str(e)}")
+        _stop_voiceover(voiceover_future, voiceover_stop)
+        # the caller decides the job's final status (a tiered job still has its draft)
         raise Exception(f"Video generation failed: {str(e)}")
-    
-    finally:
-        # Clean up scene file
-        if scene_file.exists():
-            scene_file.unlink()
+
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class Transaction(BaseModel):
     id: Optional[int] = None
@@ -13,3 +13,37 @@ class Transaction(BaseModel):
     # This class is for Pydantic v2
     class Config:
         from_attributes = True  # allow .from_orm()
+
+class TransactionPage(BaseModel):
+    items: List[Transaction]
+    # pass back as ?cursor= to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class BulkTransactionError(BaseModel):
+    index: int
+    error: str
+
+class BulkTransactionResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkTransactionError] = []
+
+class StatementImportAbort(BaseModel):
+    # "decode" (the file could not be read) or "database" (a batch could not be written)
+    reason: str
+    # row indexes of the batch that was rolled back; to_index is None when unknown
+    from_index: int
+    to_index: Optional[int] = None
+    error: str
+
+class StatementImportResult(BaseModel):
+    rows: int
+    inserted: int
+    failed: int
+    elapsed_sec: float
+    rows_per_sec: float
+    errors: List[BulkTransactionError] = []
+    # index of the last committed row: pass back as resume_after to continue
+    resume_after: Optional[int] = None
+    # set when the import stopped early; every row up to resume_after is committed
+    aborted: Optional[StatementImportAbort] = None
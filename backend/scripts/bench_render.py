@@ -0,0 +1,80 @@
+"""
+Benchmark the video render engines on the same answer text.
+
+Engines:
+    manim        whole FinancialHelpScene on a warm render worker
+    segmented    FinancialHelpBody on a warm worker, concatenated with the
+                 cached intro/outro (what the "manim" engine does per job)
+    compositor   pre-rasterised text cards blended with NumPy, one ffmpeg encode
+
+Worker start-up and the one-off intro/outro renders are done before timing,
+as they are at API start-up. Prints the median and best wall time per engine.
+
+Usage (from the backend directory):
+    python -m scripts.bench_render
+    python -m scripts.bench_render --runs 5 --quality m --engines compositor
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.services import compositor, render_pool, scene_segments
+from app.services.video_generator import SCENE_TEMPLATE_VERSION
+
+ENGINES = ("manim", "segmented", "compositor")
+
+SAMPLE_TEXT = (
+    "An ETF is a basket of investments, like stocks or bonds, that trades on an exchange "
+    "just like a single stock. Buying one share gives you a small piece of everything in "
+    "the basket, so it is an easy and usually low-cost way to diversify. Many ETFs simply "
+    "track an index such as the S&P 500."
+)
+
+
+def render_once(engine: str, text: str, quality: str, workdir: str) -> None:
+    output_path = os.path.join(workdir, "FinancialHelpScene.mp4")
+    media_dir = os.path.join(workdir, "media")
+    if engine == "compositor":
+        compositor.render(text, output_path, quality)
+    elif engine == "segmented":
+        body_path = render_pool.render_scene("FinancialHelpBody", media_dir, quality, text)
+        intro_path = scene_segments.get_segment("intro", SCENE_TEMPLATE_VERSION, quality)
+        outro_path = scene_segments.get_segment("outro", SCENE_TEMPLATE_VERSION, quality)
+        scene_segments.concat([intro_path, body_path, outro_path], output_path)
+    else:
+        render_pool.render_financial_help(text, media_dir, quality)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the video render engines")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--quality", choices=sorted(compositor.RESOLUTIONS), default="l")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--text", default=SAMPLE_TEXT)
+    args = parser.parse_args(argv)
+
+    if {"manim", "segmented"} & set(args.engines):
+        render_pool.start()
+    if "segmented" in args.engines:
+        for name in scene_segments.SHARED_SEGMENTS:
+            scene_segments.get_segment(name, SCENE_TEMPLATE_VERSION, args.quality)
+
+    width, height, fps = compositor.RESOLUTIONS[args.quality]
+    print(f"{len(args.text)} chars at {width}x{height} {fps}fps, {args.runs} runs per engine")
+    try:
+        for engine in args.engines:
+            seconds = []
+            for _ in range(args.runs):
+                with tempfile.TemporaryDirectory() as workdir:
+                    started = time.perf_counter()
+                    render_once(engine, args.text, args.quality, workdir)
+                    seconds.append(time.perf_counter() - started)
+            print(f"{engine:>10}: median {statistics.median(seconds):6.2f}s | best {min(seconds):6.2f}s")
+    finally:
+        render_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark concurrent single-transaction writes in both storage modes.
+
+Each mode gets a fresh SQLite file in a temp directory. --clients coroutines
+write --rows transactions between them while one reader keeps paging the
+same user's transactions, so the output shows write throughput, failed
+writes ("database is locked") and how long reads took meanwhile.
+
+Usage (from the backend directory):
+    python -m scripts.bench_writes
+    python -m scripts.bench_writes --rows 20000 --clients 200
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import make_engines, migrate_schema
+from app.services import transaction_crud
+from app.services.transaction_writer import TransactionWriter
+from app.utils.schemas import Transaction
+
+MERCHANTS = ["Starbucks", "Walmart", "Netflix", "Landlord", "Shell Gas", "Uber Eats"]
+
+
+def make_txn(i: int) -> Transaction:
+    return Transaction(
+        user_id="bench",
+        merchant=MERCHANTS[i % len(MERCHANTS)],
+        amount=float(i % 200),
+        date=datetime.datetime(2025, 1, 1) + datetime.timedelta(minutes=i),
+        category="Bench",
+    )
+
+
+async def run_mode(concurrent: bool, rows: int, clients: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_engine, aio_engine = make_engines(os.path.join(tmp, "bench.db"), concurrent=concurrent)
+        migrate_schema(bind=sync_engine)
+        session_factory = async_sessionmaker(aio_engine, autoflush=False, expire_on_commit=False)
+
+        writer = TransactionWriter(session_factory) if concurrent else None
+        if writer:
+            writer.start()
+
+        counter = iter(range(rows))
+        failed = 0
+        read_latencies = []
+        writing = True
+
+        async def write_one(txn: Transaction):
+            if writer:
+                return await writer.submit(txn)
+            async with session_factory() as db:
+                return await db.run_sync(transaction_crud.create_transaction, txn)
+
+        async def client():
+            nonlocal failed
+            for i in counter:
+                try:
+                    await write_one(make_txn(i))
+                except Exception:
+                    failed += 1
+
+        async def reader():
+            while writing:
+                started = time.perf_counter()
+                async with session_factory() as db:
+                    await db.run_sync(transaction_crud.get_transactions, "bench")
+                read_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0)
+
+        reader_task = asyncio.create_task(reader())
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        writing = False
+        await reader_task
+
+        commits = rows - failed
+        if writer:
+            commits = writer.commits
+            await writer.stop()
+        await aio_engine.dispose()
+        sync_engine.dispose()
+
+    return {
+        "mode": "concurrent" if concurrent else "default",
+        "written": rows - failed,
+        "failed": failed,
+        "commits": commits,
+        "rows_per_sec": round((rows - failed) / elapsed, 1) if elapsed else 0.0,
+        "read_ms_median": round(statistics.median(read_latencies) * 1000, 2) if read_latencies else None,
+        "reads": len(read_latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark concurrent transaction writes")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    for concurrent in (False, True):
+        result = asyncio.run(run_mode(concurrent, args.rows, args.clients))
+        print(f"{result['mode']:>10}: {result['written']:>7} written | {result['failed']:>6} failed | "
+              f"{result['commits']:>7} commits | {result['rows_per_sec']:>9} rows/s | "
+              f"read median {result['read_ms_median']} ms over {result['reads']} reads")
+
+
+if __name__ == "__main__":
+    main()
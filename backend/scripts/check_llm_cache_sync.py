@@ -0,0 +1,43 @@
+"""
+Check that the two copies of the LLM completion cache are identical.
+
+backend/app/services/llm_cache.py is the source; ai-video-backend/llm_cache.py
+is deployed with the ai-video service. Exits 1 if they differ.
+
+Usage (from the backend directory):
+    python -m scripts.check_llm_cache_sync
+    python -m scripts.check_llm_cache_sync --fix   # copy the backend version over
+"""
+import argparse
+import difflib
+import shutil
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SOURCE = REPO_ROOT / "backend" / "app" / "services" / "llm_cache.py"
+COPY = REPO_ROOT / "ai-video-backend" / "llm_cache.py"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the two llm_cache.py copies are in sync")
+    parser.add_argument("--fix", action="store_true", help="overwrite the ai-video-backend copy")
+    args = parser.parse_args(argv)
+
+    source, copy = SOURCE.read_text(), COPY.read_text()
+    if source == copy:
+        print("✅ llm_cache.py copies are in sync")
+        return 0
+    if args.fix:
+        shutil.copyfile(SOURCE, COPY)
+        print(f"✅ Copied {SOURCE} to {COPY}")
+        return 0
+    sys.stdout.writelines(difflib.unified_diff(
+        copy.splitlines(keepends=True), source.splitlines(keepends=True), str(COPY), str(SOURCE)
+    ))
+    print(f"❌ {COPY} differs from {SOURCE}; run with --fix")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
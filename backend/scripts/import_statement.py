@@ -0,0 +1,69 @@
+"""
+Stream a CSV or NDJSON bank export into the database.
+
+Usage (from the backend directory):
+    python -m scripts.import_statement statement.csv --user-id demo
+    cat export.ndjson | python -m scripts.import_statement - --format ndjson
+    python -m scripts.import_statement statement.csv --resume-after 41999
+"""
+import argparse
+import sys
+
+from app.core.database import SessionLocal, Base, engine
+from app.services import statement_import
+from app.services.transaction_crud import BULK_BATCH_SIZE
+
+
+def print_progress(progress: dict):
+    print(f"  {progress['rows']:>10} rows | {progress['inserted']:>10} inserted | "
+          f"{progress['failed']:>6} failed | {progress['rows_per_sec']:>10} rows/s", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a bank statement export")
+    parser.add_argument("path", help="CSV/NDJSON file, or - for stdin")
+    parser.add_argument("--format", choices=statement_import.SUPPORTED_FORMATS,
+                        help="file format (default: guessed from the file extension)")
+    parser.add_argument("--user-id", help="user_id for rows that do not carry one")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--resume-after", type=int,
+                        help="skip rows up to this index (resume_after of an interrupted import)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or statement_import.detect_format(args.path)
+    if not fmt:
+        parser.error("cannot guess the format, pass --format")
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+    try:
+        summary = statement_import.import_statement(
+            db, stream, fmt,
+            user_id=args.user_id,
+            batch_size=args.batch_size,
+            progress_callback=print_progress,
+            resume_after=args.resume_after,
+        )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        db.close()
+
+    for error in summary["errors"]:
+        print(f"  row {error['index']}: {error['error']}", file=sys.stderr)
+    aborted = summary["aborted"]
+    if aborted:
+        to_index = aborted["to_index"] if aborted["to_index"] is not None else "end"
+        print(f"❌ Import stopped ({aborted['reason']}) at rows {aborted['from_index']}-{to_index}: {aborted['error']}",
+              file=sys.stderr)
+        if summary["resume_after"] is not None:
+            print(f"   {summary['inserted']} rows committed; continue with --resume-after {summary['resume_after']}",
+                  file=sys.stderr)
+        return 2
+    print(f"✅ Imported {summary['inserted']} of {summary['rows']} rows in {summary['elapsed_sec']}s")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+Recompute the per-user monthly spending rollups from the transactions table.
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_rollups                  # every user
+    python -m scripts.rebuild_rollups --user-id demo   # one user
+"""
+import argparse
+import time
+
+from app.core.database import SessionLocal, migrate_schema
+from app.services import transaction_crud
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild monthly spending rollups")
+    parser.add_argument("--user-id", help="only rebuild this user's rollups")
+    args = parser.parse_args(argv)
+
+    migrate_schema()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        written = transaction_crud.rebuild_rollups(db, user_id=args.user_id)
+    print(f"✅ Wrote {written} rollup rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Recompute stored classification labels after the keyword rules change.
+
+Usage (from the backend directory):
+    python -m scripts.reclassify                  # every transaction
+    python -m scripts.reclassify --user-id demo   # one user
+    python -m scripts.reclassify --only-missing   # rows with no label yet
+"""
+import argparse
+import time
+
+from app.core.database import SessionLocal, migrate_schema
+from app.models.transaction_db import TransactionDB
+from app.services import transaction_crud
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute transaction classification labels")
+    parser.add_argument("--user-id", help="only reclassify this user's transactions")
+    parser.add_argument("--only-missing", action="store_true", help="only label rows that have no label")
+    parser.add_argument("--batch-size", type=int, default=transaction_crud.BULK_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    migrate_schema()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        updated = transaction_crud.reclassify_transactions(
+            db,
+            user_id=args.user_id,
+            only_missing=args.only_missing,
+            batch_size=args.batch_size,
+        )
+    print(f"✅ Updated {updated} labels in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
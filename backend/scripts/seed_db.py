@@ -1,5 +1,6 @@
 from app.core.database import SessionLocal, Base, engine
 from app.models.transaction_db import TransactionDB
+from app.services import transaction_crud
 import datetime
 
 # recreate tables
@@ -19,6 +20,8 @@ mock_data = [
 
 db.add_all(mock_data)
 db.commit()
+transaction_crud.reclassify_transactions(db)
+transaction_crud.rebuild_rollups(db)
 db.close()
 
 print("✅ Database seeded with mock transactions for user_id='demo'")